@@ -0,0 +1,256 @@
+"""
+asyncio-native counterpart of backend.DeepLTranslator.
+
+AsyncDeepLTranslator offers the same operations (key validation, text, SRT,
+TXT and document translation, OCR) on a pooled aiohttp client, so it can be
+embedded in an async service without burning a thread per call:
+
+- one ClientSession / connection pool per translator, shared by all jobs
+- a semaphore bounds the number of in-flight DeepL requests
+- document status polling uses asyncio.sleep instead of time.sleep
+- file parsing/writing and OCR run in an executor, off the event loop
+- every operation is a plain coroutine, so cancelling the task cancels the job
+
+Usage:
+    async with AsyncDeepLTranslator(api_key) as translator:
+        await translator.translate_srt_file("a.srt", "ID", "a_ID.srt")
+"""
+import asyncio
+import functools
+import os
+from xml.sax.saxutils import escape, unescape
+
+import aiohttp
+
+from backend import (
+    PACKED_CUE_OPTIONS,
+    DeepLTranslator,
+    encoded_size,
+    iter_batches,
+    pack_cues,
+    plan_packs,
+    unpack_cues,
+)
+from cue_store import CueStore
+from segmentation import Segment, SegmentationStats
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AsyncDeepLTranslator:
+    def __init__(self, api_key=None, max_concurrency=16, max_retries=3, ocr_executor=None):
+        """
+        Args:
+            api_key: DeepL API key (defaults to DEEPL_API_KEY)
+            max_concurrency: Maximum number of DeepL requests in flight
+            max_retries: Retries on 429/5xx responses, with exponential backoff
+            ocr_executor: Executor for OCR, e.g. a ProcessPoolExecutor (default:
+                the loop's default executor, which also handles file parsing)
+        """
+        self.api_key = api_key or os.getenv("DEEPL_API_KEY")
+        if not self.api_key:
+            raise ValueError("API Key not found. Please set DEEPL_API_KEY in .env or pass it to the constructor.")
+
+        self.base_url = "https://api-free.deepl.com/v2"
+        if not self.api_key.endswith(":fx"):
+            self.base_url = "https://api.deepl.com/v2"
+
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.ocr_executor = ocr_executor
+        self.timeout = aiohttp.ClientTimeout(sock_connect=10, sock_read=30)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={"Authorization": f"DeepL-Auth-Key {self.api_key}"},
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=self.timeout
+            )
+        return self._session
+
+    async def _run_blocking(self, func, *args, executor=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    async def _request_json(self, method, path, data=None, timeout=None):
+        """Sends one request with bounded concurrency and retries, returning the JSON body."""
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                async with self.session.request(
+                    method, f"{self.base_url}{path}", data=data() if callable(data) else data,
+                    timeout=timeout or self.timeout
+                ) as response:
+                    if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                        retry_after = response.headers.get("Retry-After")
+                        delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+                    else:
+                        response.raise_for_status()
+                        return await response.json()
+            # Back off outside the semaphore so other requests can proceed
+            await asyncio.sleep(delay)
+
+    async def validate_api_key(self):
+        """Checks if the API key is valid by querying usage."""
+        try:
+            return True, await self._request_json("GET", "/usage")
+        except aiohttp.ClientError as e:
+            return False, str(e)
+
+    async def translate_text_content(self, text, target_lang, **options):
+        """Translates a simple string or list of strings."""
+        texts = [text] if isinstance(text, str) else list(text)
+        form = [("text", t) for t in texts] + [("target_lang", target_lang)] + list(options.items())
+        try:
+            result = await self._request_json("POST", "/translate", data=form)
+            return [t["text"] for t in result["translations"]]
+        except Exception as e:
+            raise Exception(f"Translation failed: {str(e)}") from e
+
+    async def translate_texts(self, texts, target_lang, pack=False, markup=False):
+        """
+        Translates a list of cue texts, returning translations in order.
+
+        Same modes as DeepLTranslator.iter_translations; batches are sent
+        concurrently (bounded by max_concurrency).
+        """
+        texts = list(texts)
+        if not pack:
+            options = {"tag_handling": "xml"} if markup else {}
+            batches = await asyncio.gather(*[
+                self.translate_text_content(batch, target_lang, **options)
+                for batch in iter_batches(texts)
+            ])
+            return [t for batch in batches for t in batch]
+
+        fragments = texts if markup else [escape(t) for t in texts]
+        packs = [(group, pack_cues(group)) for group in plan_packs(fragments)]
+        batches = list(iter_batches(packs, size=lambda p: encoded_size(p[1])))
+        results = await asyncio.gather(*[
+            self.translate_text_content([packed for _, packed in batch], target_lang, **PACKED_CUE_OPTIONS)
+            for batch in batches
+        ])
+
+        translated = []
+        for batch, batch_results in zip(batches, results):
+            for (group, _), packed_result in zip(batch, batch_results):
+                unpacked = unpack_cues(packed_result, len(group))
+                if unpacked is None:
+                    print(f"[DEBUG] Packed cue tags came back mangled, retrying {len(group)} cues one by one")
+                    unpacked = await self.translate_texts(group, target_lang, markup=True)
+                translated.extend(unpacked)
+        return translated if markup else [unescape(t) for t in translated]
+
+    async def translate_txt_file(self, filepath, target_lang, output_path):
+        content = await self._run_blocking(_read_text, filepath)
+        translated_texts = await self.translate_text_content([content], target_lang)
+        await self._run_blocking(_write_text, output_path, translated_texts[0])
+
+    async def translate_srt_file(self, filepath, target_lang, output_path, pack_cues=False, filter_cues=False):
+        """Async version of DeepLTranslator.translate_srt_file; returns SegmentationStats or None."""
+        cues = await self._run_blocking(CueStore.from_file, filepath)
+        texts = list(cues.iter_texts())
+        stats = None
+
+        if filter_cues:
+            stats = SegmentationStats()
+            segments = await self._run_blocking(_segment_all, texts)
+            for segment in segments:
+                stats.add(segment)
+            translatable = [s for s in segments if not s.passthrough]
+            translated = iter(await self.translate_texts(
+                [s.markup for s in translatable], target_lang, pack=pack_cues, markup=True
+            ))
+            texts = [s.text if s.passthrough else s.restore(next(translated)) for s in segments]
+        else:
+            texts = await self.translate_texts(texts, target_lang, pack=pack_cues)
+
+        translated_cues = cues.with_texts(texts)
+        await self._run_blocking(_write_text, output_path, translated_cues.to_srt())
+        return stats
+
+    async def translate_document(self, filepath, target_lang, output_path, poll_interval=5):
+        """Handles DOCX and PDF using the DeepL Document API without blocking the loop."""
+
+        # 1. Upload
+        content = await self._run_blocking(_read_bytes, filepath)
+
+        def upload_form():
+            form = aiohttp.FormData()
+            form.add_field("target_lang", target_lang)
+            form.add_field("file", content, filename=os.path.basename(filepath))
+            return form
+
+        data = await self._request_json("POST", "/document", data=upload_form)
+        doc_id = data["document_id"]
+        doc_key = data["document_key"]
+
+        # 2. Check Status
+        while True:
+            status_data = await self._request_json(
+                "POST", f"/document/{doc_id}", data={"document_key": doc_key}
+            )
+            status = status_data["status"]
+            if status == "done":
+                break
+            elif status == "error":
+                raise Exception(f"Document translation error: {status_data.get('error_message')}")
+
+            seconds = status_data.get("seconds_remaining")
+            if seconds is None:
+                seconds = 2
+            await asyncio.sleep(min(seconds, poll_interval))
+
+        # 3. Download
+        async with self._semaphore:
+            async with self.session.post(
+                f"{self.base_url}/document/{doc_id}/result",
+                data={"document_key": doc_key},
+                timeout=aiohttp.ClientTimeout(sock_connect=10, sock_read=300)
+            ) as response:
+                response.raise_for_status()
+                f = await self._run_blocking(open, output_path, "wb")
+                try:
+                    async for chunk in response.content.iter_chunked(65536):
+                        await self._run_blocking(f.write, chunk)
+                finally:
+                    await self._run_blocking(f.close)
+
+    async def extract_text_from_image(self, image_path_or_pil, lang='eng+ind'):
+        """Runs Tesseract OCR in the executor (pass a ProcessPoolExecutor for CPU-heavy loads)."""
+        return await self._run_blocking(
+            DeepLTranslator.extract_text_from_image, image_path_or_pil, lang, executor=self.ocr_executor
+        )
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _segment_all(texts):
+    return [Segment(text) for text in texts]
+
+
+def _write_text(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
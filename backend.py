@@ -1,7 +1,11 @@
 import os
+import threading
 import time
+import xml.etree.ElementTree as ET
+from contextlib import nullcontext
+from urllib.parse import quote_plus
+from xml.sax.saxutils import escape, unescape
 import requests
-import srt
 from dotenv import load_dotenv
 from PIL import Image
 import pytesseract
@@ -18,8 +22,436 @@ except ImportError:
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-class DeepLTranslator:
-    def __init__(self, api_key=None):
+from cue_store import CueStore
+from segmentation import SegmentationStats, translate_segmented
+from incremental import IncrementalStats, align_previous_translations, merge_translations
+from docx_split import translate_docx_in_parts
+from ocr_detect import detect_ocr_language
+
+# DeepL allows up to 50 texts per request and a 128 KiB request body. The
+# body is form-encoded, so batches are budgeted by encoded size (tags and
+# non-ASCII text grow several-fold), leaving room for the other form fields.
+MAX_TEXTS_PER_REQUEST = 50
+MAX_REQUEST_BYTES = 120000
+
+# Upper bound for the characters packed into a single DeepL text element.
+PACK_MAX_CHARS = 4000
+
+# Form options for packed cue transport: every <c> element is its own sentence
+# boundary, while line breaks and tag placeholders inside a cue stay part of
+# the sentence.
+PACKED_CUE_OPTIONS = {
+    "tag_handling": "xml",
+    "splitting_tags": "c",
+    "non_splitting_tags": "br,x",
+}
+
+
+def encoded_size(text):
+    """Bytes a text adds to the form-encoded request body, as "text=...&"."""
+    return len(quote_plus(text)) + 6
+
+
+def iter_batches(items, max_items=MAX_TEXTS_PER_REQUEST, max_bytes=MAX_REQUEST_BYTES, size=encoded_size):
+    """Groups items into request-sized batches by count and total encoded size."""
+    batch = []
+    batch_bytes = 0
+    for item in items:
+        item_bytes = size(item)
+        if batch and (len(batch) >= max_items or batch_bytes + item_bytes > max_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(item)
+        batch_bytes += item_bytes
+    if batch:
+        yield batch
+
+
+def plan_packs(fragments, max_chars=PACK_MAX_CHARS):
+    """Groups consecutive XML cue fragments into packs of at most max_chars."""
+    pack = []
+    pack_chars = 0
+    for fragment in fragments:
+        if pack and pack_chars + len(fragment) > max_chars:
+            yield pack
+            pack = []
+            pack_chars = 0
+        pack.append(fragment)
+        pack_chars += len(fragment)
+    if pack:
+        yield pack
+
+
+def pack_cues(fragments):
+    """Wraps XML cue fragments in id-tagged <c> elements for one DeepL text."""
+    parts = []
+    for i, fragment in enumerate(fragments):
+        body = fragment.replace("\n", "<br/>")
+        parts.append(f'<c id="{i}">{body}</c>')
+    return "".join(parts)
+
+
+def _inner_xml(element):
+    """Serializes the content of a <c> element back into a cue fragment."""
+    parts = [escape(element.text or "")]
+    for child in element:
+        tail = child.tail
+        if child.tag == "br":
+            parts.append("\n")
+        else:
+            child.tail = None
+            parts.append(ET.tostring(child, encoding="unicode"))
+        parts.append(escape(tail or ""))
+    return "".join(parts)
+
+
+def unpack_cues(packed_text, expected):
+    """
+    Splits a translated pack back into cue fragments.
+
+    Returns None when the tags did not survive translation intact, i.e. the
+    XML is broken, ids are missing or reordered, or text leaked outside them.
+    """
+    try:
+        root = ET.fromstring(f"<r>{packed_text}</r>")
+    except ET.ParseError:
+        return None
+    if (root.text or "").strip():
+        return None
+    cues = list(root)
+    if [cue.tag for cue in cues] != ["c"] * expected:
+        return None
+    if [cue.get("id") for cue in cues] != [str(i) for i in range(expected)]:
+        return None
+    if any((cue.tail or "").strip() for cue in cues):
+        return None
+    return [_inner_xml(cue) for cue in cues]
+
+
+SUPPORTED_EXTENSIONS = (".srt", ".txt", ".docx", ".pdf")
+
+
+def output_path_for(filepath, target_lang):
+    """Output file next to the source, with the language appended: name_<LANG>.ext"""
+    directory = os.path.dirname(filepath)
+    name, ext = os.path.splitext(os.path.basename(filepath))
+    return os.path.join(directory, f"{name}_{target_lang}{ext}")
+
+
+class BaseTranslator:
+    """
+    Translation jobs (text, SRT, TXT, documents, OCR) on top of three
+    transport methods, which subclasses implement: validate_api_key,
+    translate_text_content and _translate_document_job.
+    """
+
+    def __init__(self):
+        # Optional profiling.JobProfiler; jobs record their stages on it
+        self.profiler = None
+        # Text requests sent upstream (one per translate_text_content HTTP call)
+        self.text_requests = 0
+        self._text_requests_lock = threading.Lock()
+
+    def _count_text_request(self):
+        with self._text_requests_lock:
+            self.text_requests += 1
+
+    def profile_stage(self, name):
+        """Profiling context for a job stage (no-op unless a profiler is attached)."""
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def _profiled(self, name, iterable):
+        """Profiles the production of every item of a stream as stage `name`."""
+        return self.profiler.iter_stage(name, iterable) if self.profiler is not None else iterable
+
+    def validate_api_key(self):
+        """Returns (True, usage info) or (False, error message)."""
+        raise NotImplementedError
+
+    def translate_text_content(self, text, target_lang, **options):
+        """Translates a string or list of strings, returning a list of translations."""
+        raise NotImplementedError
+
+    def _translate_document_job(self, filepath, target_lang, output_path):
+        """Translates one document with the Document API into output_path."""
+        raise NotImplementedError
+
+    def translate_txt_file(self, filepath, target_lang, output_path):
+        with self.profile_stage("parse"), open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+        
+        # DeepL can handle large text, but it's better to split if huge. 
+        # For simplicity, assuming reasonable size or DeepL handles it.
+        # Actually DeepL has a limit per request (128KB). 
+        # If content is large, we should split. For now, let's assume it fits or simple split by lines.
+        
+        translated_texts = self.translate_text_content([content], target_lang)
+        
+        with self.profile_stage("write"), open(output_path, "w", encoding="utf-8") as f:
+            f.write(translated_texts[0])
+            
+    def iter_translations(self, texts, target_lang, pack=False, markup=False):
+        """
+        Translates an iterable of cue texts, yielding translations in order.
+
+        By default every text is its own DeepL text element, batched to the
+        request limits. With pack=True, consecutive texts are packed into
+        id-tagged XML elements and sent with XML tag handling, which needs far
+        fewer requests and lets DeepL see neighbouring cues as context.
+
+        With markup=True the texts are XML fragments (see segmentation.py) and
+        the translations are returned as XML fragments too.
+        """
+        if markup:
+            if pack:
+                yield from self._iter_packed_translations(texts, target_lang)
+            else:
+                for batch in iter_batches(texts):
+                    yield from self.translate_text_content(batch, target_lang, tag_handling="xml")
+            return
+
+        if not pack:
+            for batch in iter_batches(texts):
+                yield from self.translate_text_content(batch, target_lang)
+            return
+
+        for fragment in self._iter_packed_translations((escape(t) for t in texts), target_lang):
+            yield unescape(fragment)
+
+    def _iter_packed_translations(self, fragments, target_lang):
+        """Translates XML cue fragments in packs, falling back per cue on mangled tags."""
+        packs = ((group, pack_cues(group)) for group in plan_packs(fragments))
+        for batch in iter_batches(packs, size=lambda p: encoded_size(p[1])):
+            results = self.translate_text_content(
+                [packed for _, packed in batch], target_lang, **PACKED_CUE_OPTIONS
+            )
+            for (group, _), packed_result in zip(batch, results):
+                unpacked = unpack_cues(packed_result, len(group))
+                if unpacked is None:
+                    print(f"[DEBUG] Packed cue tags came back mangled, retrying {len(group)} cues one by one")
+                    unpacked = []
+                    for cue_batch in iter_batches(group):
+                        unpacked.extend(self.translate_text_content(cue_batch, target_lang, tag_handling="xml"))
+                yield from unpacked
+
+    def translate_srt_file(self, filepath, target_lang, output_path, pack_cues=False, filter_cues=False):
+        """
+        Translates an SRT file cue by cue, preserving timing.
+
+        With filter_cues=True, untranslatable cues are kept locally and
+        formatting/override tags are stripped before sending (see
+        segmentation.py). Returns the SegmentationStats in that case, else None.
+        """
+        with self.profile_stage("parse"):
+            cues = CueStore.from_file(filepath)
+        stats = SegmentationStats() if filter_cues else None
+        
+        # Texts are streamed through batching (or packing) and straight into
+        # the translated store, so no per-cue lists are built along the way
+        translate = self._srt_translation_stage(target_lang, pack_cues, filter_cues, stats)
+        with self.profile_stage("compose"):
+            translated_cues = cues.with_texts(self._profiled("batch", translate(cues.iter_texts())))
+            
+        with self.profile_stage("write"), open(output_path, "w", encoding="utf-8") as f:
+            translated_cues.write_srt(f)
+
+        if stats is not None:
+            print(f"[DEBUG] Cue filtering: {stats}")
+        return stats
+
+    def _srt_translation_stage(self, target_lang, pack_cues=False, filter_cues=False, stats=None):
+        """Returns a function mapping an iterable of cue texts to their translations."""
+        if filter_cues:
+            return lambda texts: translate_segmented(
+                texts,
+                lambda fragments: self.iter_translations(fragments, target_lang, pack=pack_cues, markup=True),
+                stats
+            )
+        return lambda texts: self.iter_translations(texts, target_lang, pack=pack_cues)
+
+    def translate_srt_file_incremental(self, filepath, target_lang, output_path,
+                                       previous_source, previous_translation,
+                                       pack_cues=False, filter_cues=False):
+        """
+        Re-translates an edited SRT file, reusing an earlier translation.
+
+        Cues whose text is unchanged from previous_source keep their translation
+        from previous_translation (with the new timestamps); only changed or
+        new cues are sent to DeepL. Returns IncrementalStats.
+        """
+        with self.profile_stage("parse"):
+            cues = CueStore.from_file(filepath)
+            carried = align_previous_translations(
+                cues, CueStore.from_file(previous_source), CueStore.from_file(previous_translation)
+            )
+        reused = sum(1 for text in carried if text is not None)
+        stats = IncrementalStats(reused, len(cues) - reused)
+        print(f"[DEBUG] Incremental translation: {stats}")
+
+        translate = self._srt_translation_stage(target_lang, pack_cues, filter_cues, SegmentationStats())
+        with self.profile_stage("compose"):
+            translated_cues = cues.with_texts(
+                self._profiled("batch", merge_translations(carried, translate, cues.iter_texts()))
+            )
+
+        with self.profile_stage("write"), open(output_path, "w", encoding="utf-8") as f:
+            translated_cues.write_srt(f)
+        return stats
+
+    def translate_file(self, filepath, target_lang, output_path, pack_cues=False, filter_cues=False, split_docx=False):
+        """
+        Translates any supported file, dispatching on its extension.
+
+        pack_cues/filter_cues only apply to SRT files, whose result
+        (SegmentationStats or None) is returned; split_docx only to DOCX files.
+        """
+        ext_lower = os.path.splitext(filepath)[1].lower()
+        if ext_lower == ".txt":
+            self.translate_txt_file(filepath, target_lang, output_path)
+        elif ext_lower == ".srt":
+            return self.translate_srt_file(filepath, target_lang, output_path, pack_cues, filter_cues)
+        elif ext_lower in [".docx", ".pdf"]:
+            self.translate_document(filepath, target_lang, output_path, split=split_docx)
+        else:
+            raise Exception(f"Unsupported file format: {ext_lower}")
+
+    def translate_document(self, filepath, target_lang, output_path, split=False):
+        """
+        Handles DOCX and PDF using DeepL Document API.
+
+        With split=True, large DOCX files are translated as several concurrent
+        document jobs and merged (see docx_split.py).
+        """
+        if split and filepath.lower().endswith(".docx"):
+            translate_docx_in_parts(self, filepath, target_lang, output_path)
+            return
+        
+        with self.profile_stage("http"):
+            self._translate_document_job(filepath, target_lang, output_path)
+
+    @staticmethod
+    def prepare_ocr_image(image_path_or_pil, lang='eng+ind', fallback_lang='eng+ind'):
+        """
+        Opens the image (path or PIL Image), converts it to a mode Tesseract
+        accepts and resolves lang='auto' (rotating the image upright if needed).
+
+        Returns:
+            tuple: (PIL Image, Tesseract language string)
+        """
+        # If it's a string path, open the image
+        if isinstance(image_path_or_pil, str):
+            print(f"[DEBUG] Opening image from path: {image_path_or_pil}")
+            image = Image.open(image_path_or_pil)
+        else:
+            # Assume it's already a PIL Image
+            print(f"[DEBUG] Using PIL Image object")
+            image = image_path_or_pil
+        
+        print(f"[DEBUG] Original image mode: {image.mode}, size: {image.size}")
+        
+        # Convert image to RGB if it's not already
+        # This fixes issues with RGBA, P, L, and other modes from clipboard
+        if image.mode not in ('RGB', 'L'):
+            print(f"[DEBUG] Converting image from {image.mode} to RGB...")
+            # Convert RGBA to RGB with white background
+            if image.mode == 'RGBA':
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.split()[3])  # Use alpha channel as mask
+                image = background
+                print(f"[DEBUG] RGBA converted to RGB with white background")
+            else:
+                # Convert other modes to RGB
+                image = image.convert('RGB')
+                print(f"[DEBUG] Converted to RGB using convert() method")
+        else:
+            print(f"[DEBUG] Image already in compatible mode: {image.mode}")
+        
+        print(f"[DEBUG] Final image mode before OCR: {image.mode}")
+        
+        if lang == 'auto':
+            detection = detect_ocr_language(image, fallback_lang)
+            print(f"[DEBUG] Auto OCR language: {detection}")
+            if detection.rotate:
+                # OSD reports the clockwise rotation, PIL rotates counter-clockwise
+                image = image.rotate(-detection.rotate, expand=True, fillcolor="white")
+            lang = detection.lang
+        return image, lang
+
+    @staticmethod
+    def extract_text_from_image(image_path_or_pil, lang='eng+ind', fallback_lang='eng+ind'):
+        """
+        Extracts text from an image using Tesseract OCR.
+        
+        Args:
+            image_path_or_pil: Either a file path (str) or a PIL Image object
+            lang: Language(s) for OCR. Default is 'eng+ind' (English + Indonesian)
+                  Common options: 'eng', 'ind', 'eng+ind', 'jpn', 'chi_sim', etc.
+                  'auto' detects the script first and loads a single model
+                  (see ocr_detect.py)
+            fallback_lang: Languages used in auto mode when detection is not confident
+        
+        Returns:
+            str: Extracted text from the image
+        """
+        import tempfile
+        temp_file = None
+        
+        try:
+            image, lang = DeepLTranslator.prepare_ocr_image(image_path_or_pil, lang, fallback_lang)
+
+            # Try direct OCR first
+            try:
+                print(f"[DEBUG] Attempting direct OCR with language: {lang}")
+                text = pytesseract.image_to_string(image, lang=lang)
+                print(f"[DEBUG] Direct OCR completed successfully, extracted {len(text)} characters")
+                return text.strip()
+            except Exception as direct_error:
+                print(f"[DEBUG] Direct OCR failed: {str(direct_error)}")
+                print(f"[DEBUG] Trying alternative method: saving to temp file first...")
+                
+                # Fallback: Save to temporary file and OCR from file
+                temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
+                temp_path = temp_file.name
+                temp_file.close()
+                
+                print(f"[DEBUG] Saving image to temp file: {temp_path}")
+                image.save(temp_path, 'PNG')
+                
+                print(f"[DEBUG] Attempting OCR from temp file...")
+                text = pytesseract.image_to_string(temp_path, lang=lang)
+                print(f"[DEBUG] Temp file OCR completed successfully, extracted {len(text)} characters")
+                
+                # Clean up temp file
+                try:
+                    os.unlink(temp_path)
+                    print(f"[DEBUG] Temp file cleaned up")
+                except:
+                    pass
+                
+                return text.strip()
+                
+        except pytesseract.TesseractNotFoundError:
+            raise Exception("Tesseract OCR not found! Please install Tesseract OCR first.\n\nDownload from: https://github.com/UB-Mannheim/tesseract/wiki")
+        except Exception as e:
+            print(f"[DEBUG] OCR Error: {type(e).__name__}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            raise Exception(f"OCR failed: {str(e)}")
+        finally:
+            # Clean up temp file if it exists
+            if temp_file and os.path.exists(temp_file.name):
+                try:
+                    os.unlink(temp_file.name)
+                except:
+                    pass
+
+
+class DeepLTranslator(BaseTranslator):
+    """BaseTranslator talking to the DeepL API with a single key."""
+
+    def __init__(self, api_key=None, max_retries=3, base_url=None):
+        super().__init__()
         self.api_key = api_key or os.getenv("DEEPL_API_KEY")
         if not self.api_key:
             raise ValueError("API Key not found. Please set DEEPL_API_KEY in .env or pass it to the constructor.")
@@ -28,11 +460,14 @@ class DeepLTranslator:
         # Check if key indicates Pro (usually doesn't end in :fx for Pro, but Free keys end in :fx)
         if not self.api_key.endswith(":fx"):
              self.base_url = "https://api.deepl.com/v2"
+        # Explicit endpoint, e.g. a local stand-in for testing
+        if base_url:
+            self.base_url = base_url.rstrip("/")
 
         # Initialize session with retry strategy
         self.session = requests.Session()
         retry_strategy = Retry(
-            total=3,  # Total number of retries
+            total=max_retries,  # Total number of retries
             backoff_factor=1,  # Wait 1s, 2s, 4s between retries
             status_forcelist=[429, 500, 502, 503, 504],  # Retry on these errors
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]  # Retry on these methods
@@ -57,67 +492,34 @@ class DeepLTranslator:
         except requests.exceptions.RequestException as e:
             return False, str(e)
 
-    def translate_text_content(self, text, target_lang):
-        """Translates a simple string or list of strings."""
+    def translate_text_content(self, text, target_lang, **options):
+        """
+        Translates a simple string or list of strings.
+
+        Extra keyword arguments are sent as DeepL form options
+        (e.g. tag_handling="xml").
+        """
         try:
-            response = self.session.post(
-                f"{self.base_url}/translate",
-                headers={"Authorization": f"DeepL-Auth-Key {self.api_key}"},
-                data={
-                    "text": text,
-                    "target_lang": target_lang
-                },
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            result = response.json()
+            self._count_text_request()
+            with self.profile_stage("http"):
+                response = self.session.post(
+                    f"{self.base_url}/translate",
+                    headers={"Authorization": f"DeepL-Auth-Key {self.api_key}"},
+                    data={
+                        "text": text,
+                        "target_lang": target_lang,
+                        **options
+                    },
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                result = response.json()
             return [t["text"] for t in result["translations"]]
         except Exception as e:
-            raise Exception(f"Translation failed: {str(e)}")
+            raise Exception(f"Translation failed: {str(e)}") from e
 
-    def translate_txt_file(self, filepath, target_lang, output_path):
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # DeepL can handle large text, but it's better to split if huge. 
-        # For simplicity, assuming reasonable size or DeepL handles it.
-        # Actually DeepL has a limit per request (128KB). 
-        # If content is large, we should split. For now, let's assume it fits or simple split by lines.
-        
-        translated_texts = self.translate_text_content([content], target_lang)
-        
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(translated_texts[0])
-            
-    def translate_srt_file(self, filepath, target_lang, output_path):
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-            
-        subs = list(srt.parse(content))
-        
-        # Extract text to translate
-        texts_to_translate = [sub.content for sub in subs]
-        
-        # Batching to avoid hitting request limits or size limits
-        # DeepL allows up to 50 texts per request.
-        batch_size = 50
-        translated_texts = []
-        
-        for i in range(0, len(texts_to_translate), batch_size):
-            batch = texts_to_translate[i:i+batch_size]
-            translated_batch = self.translate_text_content(batch, target_lang)
-            translated_texts.extend(translated_batch)
-            
-        # Reconstruct SRT
-        for sub, trans_text in zip(subs, translated_texts):
-            sub.content = trans_text
-            
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(srt.compose(subs))
-
-    def translate_document(self, filepath, target_lang, output_path):
-        """Handles DOCX and PDF using DeepL Document API."""
-        
+    def _translate_document_job(self, filepath, target_lang, output_path):
+        """Upload, status polling and download of a single Document API job."""
         # 1. Upload
         with open(filepath, "rb") as f:
             response = self.session.post(
@@ -168,97 +570,3 @@ class DeepLTranslator:
         with open(output_path, "wb") as f:
             for chunk in download_response.iter_content(chunk_size=8192):
                 f.write(chunk)
-
-    def extract_text_from_image(self, image_path_or_pil, lang='eng+ind'):
-        """
-        Extracts text from an image using Tesseract OCR.
-        
-        Args:
-            image_path_or_pil: Either a file path (str) or a PIL Image object
-            lang: Language(s) for OCR. Default is 'eng+ind' (English + Indonesian)
-                  Common options: 'eng', 'ind', 'eng+ind', 'jpn', 'chi_sim', etc.
-        
-        Returns:
-            str: Extracted text from the image
-        """
-        import tempfile
-        temp_file = None
-        
-        try:
-            # If it's a string path, open the image
-            if isinstance(image_path_or_pil, str):
-                print(f"[DEBUG] Opening image from path: {image_path_or_pil}")
-                image = Image.open(image_path_or_pil)
-            else:
-                # Assume it's already a PIL Image
-                print(f"[DEBUG] Using PIL Image object")
-                image = image_path_or_pil
-            
-            print(f"[DEBUG] Original image mode: {image.mode}, size: {image.size}")
-            
-            # Convert image to RGB if it's not already
-            # This fixes issues with RGBA, P, L, and other modes from clipboard
-            if image.mode not in ('RGB', 'L'):
-                print(f"[DEBUG] Converting image from {image.mode} to RGB...")
-                # Convert RGBA to RGB with white background
-                if image.mode == 'RGBA':
-                    background = Image.new('RGB', image.size, (255, 255, 255))
-                    background.paste(image, mask=image.split()[3])  # Use alpha channel as mask
-                    image = background
-                    print(f"[DEBUG] RGBA converted to RGB with white background")
-                else:
-                    # Convert other modes to RGB
-                    image = image.convert('RGB')
-                    print(f"[DEBUG] Converted to RGB using convert() method")
-            else:
-                print(f"[DEBUG] Image already in compatible mode: {image.mode}")
-            
-            print(f"[DEBUG] Final image mode before OCR: {image.mode}")
-            
-            # Try direct OCR first
-            try:
-                print(f"[DEBUG] Attempting direct OCR with language: {lang}")
-                text = pytesseract.image_to_string(image, lang=lang)
-                print(f"[DEBUG] Direct OCR completed successfully, extracted {len(text)} characters")
-                return text.strip()
-            except Exception as direct_error:
-                print(f"[DEBUG] Direct OCR failed: {str(direct_error)}")
-                print(f"[DEBUG] Trying alternative method: saving to temp file first...")
-                
-                # Fallback: Save to temporary file and OCR from file
-                temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-                temp_path = temp_file.name
-                temp_file.close()
-                
-                print(f"[DEBUG] Saving image to temp file: {temp_path}")
-                image.save(temp_path, 'PNG')
-                
-                print(f"[DEBUG] Attempting OCR from temp file...")
-                text = pytesseract.image_to_string(temp_path, lang=lang)
-                print(f"[DEBUG] Temp file OCR completed successfully, extracted {len(text)} characters")
-                
-                # Clean up temp file
-                try:
-                    os.unlink(temp_path)
-                    print(f"[DEBUG] Temp file cleaned up")
-                except:
-                    pass
-                
-                return text.strip()
-                
-        except pytesseract.TesseractNotFoundError:
-            raise Exception("Tesseract OCR not found! Please install Tesseract OCR first.\n\nDownload from: https://github.com/UB-Mannheim/tesseract/wiki")
-        except Exception as e:
-            print(f"[DEBUG] OCR Error: {type(e).__name__}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            raise Exception(f"OCR failed: {str(e)}")
-        finally:
-            # Clean up temp file if it exists
-            if temp_file and os.path.exists(temp_file.name):
-                try:
-                    os.unlink(temp_file.name)
-                except:
-                    pass
-
-
@@ -0,0 +1,71 @@
+"""
+Memory benchmark: srt.Subtitle lists vs. CueStore.
+
+Builds a synthetic SRT corpus and measures the memory held by the previous
+translate_srt_file representation (parsed Subtitle list + texts list +
+translations list) against CueStore (source store + translated store).
+
+Usage:
+    python benchmarks/cue_store_memory.py [number_of_cues]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import srt
+from cue_store import CueStore, _srt_timestamp
+
+
+def make_corpus(count):
+    blocks = []
+    for i in range(count):
+        start = i * 3000
+        blocks.append(
+            f"{i + 1}\n{_srt_timestamp(start)} --> {_srt_timestamp(start + 2500)}\n"
+            f"Line {i} of the dialogue goes here,\nand continues on a second line.\n"
+        )
+    return "\n".join(blocks)
+
+
+def fake_translate(text):
+    return text.upper()
+
+
+def measure(label, build):
+    tracemalloc.start()
+    kept = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} retained {current / 1e6:8.1f} MB   peak {peak / 1e6:8.1f} MB")
+    del kept
+    return current
+
+
+def build_subtitle_lists(content):
+    subs = list(srt.parse(content))
+    texts = [sub.content for sub in subs]
+    translations = [fake_translate(t) for t in texts]
+    return subs, texts, translations
+
+
+def build_cue_store(content):
+    cues = CueStore.from_srt(content)
+    translated = cues.with_texts(fake_translate(t) for t in cues.iter_texts())
+    return cues, translated
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    content = make_corpus(count)
+    print(f"{count} cues, {len(content) / 1e6:.1f} MB of SRT")
+
+    before = measure("srt.Subtitle lists", lambda: build_subtitle_lists(content))
+    after = measure("CueStore", lambda: build_cue_store(content))
+    print(f"CueStore retains {before / max(after, 1):.1f}x less memory "
+          f"({before / count:.0f} vs {after / count:.0f} bytes per cue)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+OCR benchmark: auto language detection vs. always using combined models.
+
+For every image, OCRs once with the combined languages (e.g. eng+ind) and
+once in auto mode (OSD pass + single detected model), and reports the time
+saved. The detection cache is cleared per image so the OSD cost is included.
+
+Usage:
+    python benchmarks/ocr_auto_lang.py image1.png [image2.jpg ...] [--combined eng+ind+jpn]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr_detect
+from backend import DeepLTranslator
+
+
+def timed_ocr(image_path, lang, fallback_lang):
+    started = time.perf_counter()
+    text = DeepLTranslator.extract_text_from_image(image_path, lang=lang, fallback_lang=fallback_lang)
+    return time.perf_counter() - started, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--combined", default="eng+ind", help="Combined models to compare against")
+    args = parser.parse_args()
+
+    total_combined = total_auto = 0.0
+    rows = []
+    for path in args.images:
+        combined_seconds, _ = timed_ocr(path, args.combined, args.combined)
+        ocr_detect._cache.clear()
+        auto_seconds, _ = timed_ocr(path, "auto", args.combined)
+        detection = next(iter(ocr_detect._cache.values()))
+        total_combined += combined_seconds
+        total_auto += auto_seconds
+        rows.append((os.path.basename(path), combined_seconds, auto_seconds, detection))
+
+    print()
+    print(f"{'image':<30} {args.combined:>10} {'auto':>8}  detected")
+    for name, combined_seconds, auto_seconds, detection in rows:
+        print(f"{name:<30} {combined_seconds:>9.2f}s {auto_seconds:>7.2f}s  {detection}")
+    saved = total_combined - total_auto
+    percent = 100 * saved / total_combined if total_combined else 0
+    print(f"\nTotal: {total_combined:.2f}s combined vs {total_auto:.2f}s auto "
+          f"-> {saved:.2f}s saved ({percent:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Compact columnar storage for subtitle cues.
+
+A list of srt.Subtitle objects costs several hundred bytes per cue (the object,
+two timedeltas, the content string and the index). CueStore keeps the same
+information in flat columns instead:
+
+- start/end times as integer millisecond arrays
+- all cue texts concatenated into a single string buffer plus an offsets array
+- proprietary timestamp-line data only for the (rare) cues that have it
+
+Rows are exposed through lightweight Cue views, and texts can be streamed in
+and out so large corpora never need per-cue Python objects at once.
+"""
+import io
+from array import array
+
+import srt
+
+
+def _to_ms(delta):
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def _srt_timestamp(ms):
+    secs, msecs = divmod(ms, 1000)
+    mins, secs = divmod(secs, 60)
+    hrs, mins = divmod(mins, 60)
+    return "%02d:%02d:%02d,%03d" % (hrs, mins, secs, msecs)
+
+
+class Cue:
+    """Read-only view of one row in a CueStore."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    @property
+    def index(self):
+        return self._row + 1
+
+    @property
+    def start_ms(self):
+        return self._store.starts[self._row]
+
+    @property
+    def end_ms(self):
+        return self._store.ends[self._row]
+
+    @property
+    def text(self):
+        return self._store.text(self._row)
+
+    def __repr__(self):
+        return f"Cue(index={self.index}, start_ms={self.start_ms}, end_ms={self.end_ms}, text={self.text!r})"
+
+
+class CueStore:
+    """Columnar container of subtitle cues; build it with from_srt or with_texts."""
+    __slots__ = ("starts", "ends", "_buffer", "_offsets", "_proprietary")
+
+    def __init__(self, starts, ends, buffer, offsets, proprietary=None):
+        self.starts = starts
+        self.ends = ends
+        self._buffer = buffer
+        self._offsets = offsets
+        self._proprietary = proprietary or {}
+
+    @classmethod
+    def from_srt(cls, content):
+        """Parses SRT content without keeping per-cue objects around."""
+        starts = array("q")
+        ends = array("q")
+        offsets = array("Q", [0])
+        proprietary = {}
+        buffer = io.StringIO()
+        length = 0
+
+        for row, sub in enumerate(srt.parse(content)):
+            starts.append(_to_ms(sub.start))
+            ends.append(_to_ms(sub.end))
+            buffer.write(sub.content)
+            length += len(sub.content)
+            offsets.append(length)
+            if sub.proprietary:
+                proprietary[row] = sub.proprietary
+
+        return cls(starts, ends, buffer.getvalue(), offsets, proprietary)
+
+    @classmethod
+    def from_file(cls, filepath):
+        with open(filepath, "r", encoding="utf-8") as f:
+            return cls.from_srt(f.read())
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("cue index out of range")
+        return Cue(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield Cue(self, row)
+
+    def text(self, row):
+        return self._buffer[self._offsets[row]:self._offsets[row + 1]]
+
+    def iter_texts(self):
+        """Yields cue texts in row order, e.g. to feed DeepLTranslator.iter_translations."""
+        for row in range(len(self)):
+            yield self.text(row)
+
+    @property
+    def text_chars(self):
+        return len(self._buffer)
+
+    def with_texts(self, texts):
+        """
+        Returns a new store with the same timing and the given texts.
+
+        texts may be any iterable (such as a generator of translations); it is
+        consumed lazily and written straight into the new text buffer. The
+        timing columns are shared, not copied.
+        """
+        offsets = array("Q", [0])
+        buffer = io.StringIO()
+        length = 0
+        for text in texts:
+            buffer.write(text)
+            length += len(text)
+            offsets.append(length)
+
+        if len(offsets) - 1 != len(self):
+            raise ValueError(f"Expected {len(self)} texts, got {len(offsets) - 1}")
+
+        return CueStore(self.starts, self.ends, buffer.getvalue(), offsets, self._proprietary)
+
+    def _compose_order(self):
+        """Rows in playback order, mirroring srt.compose's sort by (start, end)."""
+        rows = range(len(self))
+        starts, ends = self.starts, self.ends
+        in_order = all(
+            (starts[i], ends[i]) <= (starts[i + 1], ends[i + 1]) for i in range(len(self) - 1)
+        )
+        if in_order:
+            return rows
+        return sorted(rows, key=lambda i: (starts[i], ends[i]))
+
+    def write_srt(self, f):
+        """Writes the cues as SRT to a text file object, reindexed from 1."""
+        index = 0
+        for row in self._compose_order():
+            start, end = self.starts[row], self.ends[row]
+            content = self.text(row)
+            # Same skip rules as srt.compose
+            if not content.strip() or start < 0 or start >= end:
+                continue
+            index += 1
+            prop = self._proprietary.get(row)
+            prop = f" {prop}" if prop else ""
+            f.write(
+                f"{index}\n{_srt_timestamp(start)} --> {_srt_timestamp(end)}{prop}\n"
+                f"{srt.make_legal_content(content)}\n\n"
+            )
+
+    def to_srt(self):
+        out = io.StringIO()
+        self.write_srt(out)
+        return out.getvalue()
@@ -0,0 +1,99 @@
+"""
+Local stand-in for the DeepL API, for exercising service.py and the
+translators without a key or network access.
+
+"Translates" by appending the target language to every text (inside every
+<c> element for packed cue requests) and echoes documents back unchanged.
+GET /stats reports how many upstream calls were made.
+
+Usage:
+    python deepl_stub.py --port 8766
+    python service.py --deepl-url http://127.0.0.1:8766/v2
+"""
+import argparse
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_translate(text, target_lang, packed):
+    if packed:
+        return text.replace("</c>", f" [{target_lang}]</c>")
+    return f"{text} [{target_lang}]"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    stats = {"translate": 0, "document": 0, "texts": 0}
+    documents = {}
+
+    def _send(self, status, body, content_type="application/json"):
+        if isinstance(body, dict):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.endswith("/usage"):
+            self._send(200, {"character_count": 0, "character_limit": 500000})
+        elif path == "/stats":
+            self._send(200, self.stats)
+        else:
+            self._send(404, {"message": "Not found"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path.endswith("/translate"):
+            form = parse_qs(self._body().decode("utf-8"), keep_blank_values=True)
+            target_lang = form["target_lang"][0]
+            packed = form.get("splitting_tags", [""])[0] == "c"
+            texts = form.get("text", [])
+            with self.lock:
+                self.stats["translate"] += 1
+                self.stats["texts"] += len(texts)
+            self._send(200, {"translations": [
+                {"detected_source_language": "EN", "text": fake_translate(t, target_lang, packed)} for t in texts
+            ]})
+        elif path.endswith("/document"):
+            body = self._body()
+            # Keep the raw multipart body; the file part is echoed back as-is
+            boundary = self.headers["Content-Type"].split("boundary=")[1].encode()
+            parts = body.split(b"--" + boundary)
+            content = next(p for p in parts if b'name="file"' in p).split(b"\r\n\r\n", 1)[1][:-2]
+            doc_id = uuid.uuid4().hex
+            with self.lock:
+                self.stats["document"] += 1
+                self.documents[doc_id] = content
+            self._send(200, {"document_id": doc_id, "document_key": "stub"})
+        elif path.endswith("/result"):
+            self._send(200, self.documents.pop(path.split("/")[-2]), "application/octet-stream")
+        elif "/document/" in path:
+            self._body()
+            self._send(200, {"status": "done"})
+        else:
+            self._send(404, {"message": "Not found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the DeepL API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    print(f"DeepL stand-in listening on http://{args.host}:{args.port}/v2")
+    ThreadingHTTPServer((args.host, args.port), StubHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Parallel per-section translation of large DOCX files.
+
+A DOCX sent to the Document API is one serial job on DeepL's side. Here the
+body of word/document.xml is split at top-level block boundaries (preferring
+section and page breaks) into parts of roughly PART_TARGET_CHARS characters.
+Every part is a full copy of the package (styles, numbering, media, headers)
+with only its share of the body, so formatting is preserved. The parts are
+translated concurrently as separate document jobs, each retried on its own,
+and the translated bodies are merged back into one DOCX.
+
+DeepL bills at least 50,000 characters per document, so the default part
+size stays above that and a small remainder is merged into the last part.
+Parts whose translated relationships no longer agree cannot be merged; that
+raises DocxMergeError rather than silently paying for a second, unsplit job.
+"""
+import os
+import re
+import shutil
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+DOCUMENT_XML = "word/document.xml"
+DOCUMENT_RELS = "word/_rels/document.xml.rels"
+
+# Target size of one part (text characters); DeepL's minimum billed document size is 50,000
+PART_TARGET_CHARS = 60000
+MAX_PARALLEL_PARTS = 4
+PART_RETRIES = 3
+
+TAG_RE = re.compile(r"<(/?)([\w:.-]+)[^>]*?(/?)>|<\?.*?\?>|<!--.*?-->", re.DOTALL)
+TEXT_RE = re.compile(r"<w:t(?:\s[^>]*)?>([^<]*)</w:t>")
+PAGE_BREAK_RE = re.compile(r'<w:br\s[^>]*w:type="page"|<w:lastRenderedPageBreak')
+
+
+class DocxMergeError(Exception):
+    """Translated parts cannot be merged; the document can be retranslated without splitting."""
+
+
+def split_body(document_xml):
+    """
+    Splits document.xml into (head, blocks, final_sectpr, tail).
+
+    blocks are the top-level body elements (paragraphs, tables, ...) as raw
+    XML strings, so nothing is re-serialized and all namespaces stay intact.
+    """
+    body_open = re.search(r"<w:body(?:\s[^>]*)?>", document_xml)
+    body_close = document_xml.rindex("</w:body>")
+    head = document_xml[:body_open.end()]
+    tail = document_xml[body_close:]
+    body = document_xml[body_open.end():body_close]
+
+    blocks = []
+    depth = 0
+    start = None
+    for match in TAG_RE.finditer(body):
+        if match.group(2) is None:
+            continue  # processing instruction or comment
+        closing, self_closing = match.group(1), match.group(3)
+        if depth == 0:
+            start = match.start()
+        if closing:
+            depth -= 1
+        elif not self_closing:
+            depth += 1
+        if depth == 0:
+            blocks.append(body[start:match.end()])
+
+    final_sectpr = ""
+    if blocks and blocks[-1].startswith("<w:sectPr"):
+        final_sectpr = blocks.pop()
+    return head, blocks, final_sectpr, tail
+
+
+def text_chars(xml):
+    return sum(len(t) for t in TEXT_RE.findall(xml))
+
+
+def plan_parts(blocks, target_chars=PART_TARGET_CHARS):
+    """
+    Groups blocks into parts of about target_chars text characters, cutting
+    after a section or page break when possible and forcing a cut once a part
+    grows 50% past the target.
+    """
+    parts = [[]]
+    size = 0
+    for block in blocks:
+        parts[-1].append(block)
+        size += text_chars(block)
+        is_break = "<w:sectPr" in block or PAGE_BREAK_RE.search(block)
+        if size >= target_chars and (is_break or size >= target_chars * 1.5):
+            parts.append([])
+            size = 0
+    if not parts[-1]:
+        parts.pop()
+    # A small remainder is cheaper merged into the previous part
+    if len(parts) > 1 and sum(text_chars(b) for b in parts[-1]) < target_chars / 2:
+        parts[-2].extend(parts.pop())
+    return parts
+
+
+def _write_package(source_zip, path, document_xml):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as out:
+        for item in source_zip.infolist():
+            # writestr updates the ZipInfo it is given, so never hand it the source's
+            info = zipfile.ZipInfo(item.filename, item.date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            if item.filename == DOCUMENT_XML:
+                out.writestr(info, document_xml)
+            else:
+                out.writestr(info, source_zip.read(item.filename))
+
+
+def _translate_part(translator, part_path, target_lang, output_path):
+    for attempt in range(1, PART_RETRIES + 1):
+        try:
+            translator.translate_document(part_path, target_lang, output_path)
+            return output_path
+        except Exception as e:
+            if attempt == PART_RETRIES:
+                raise Exception(f"Part {os.path.basename(part_path)} failed after {attempt} attempts: {e}")
+            print(f"[DEBUG] DOCX split: {os.path.basename(part_path)} failed ({e}), retrying")
+            time.sleep(2 ** attempt)
+
+
+def translate_docx_in_parts(translator, filepath, target_lang, output_path,
+                            target_chars=PART_TARGET_CHARS, max_parallel=MAX_PARALLEL_PARTS):
+    """
+    Translates a DOCX as several concurrent document jobs and merges the result.
+
+    Uses a single translate_document call when the file is too small to split.
+    Raises DocxMergeError if the translated parts cannot be merged safely.
+    Returns the number of parts used.
+    """
+    with zipfile.ZipFile(filepath) as source:
+        document_xml = source.read(DOCUMENT_XML).decode("utf-8")
+        head, blocks, final_sectpr, tail = split_body(document_xml)
+        parts = plan_parts(blocks, target_chars)
+
+        if len(parts) < 2:
+            translator.translate_document(filepath, target_lang, output_path)
+            return 1
+
+        print(f"[DEBUG] DOCX split: translating {os.path.basename(filepath)} as {len(parts)} parts")
+        work_dir = tempfile.mkdtemp(prefix="docx_split_")
+        try:
+            part_paths = []
+            for i, part in enumerate(parts):
+                part_path = os.path.join(work_dir, f"part{i:03d}.docx")
+                _write_package(source, part_path, head + "".join(part) + final_sectpr + tail)
+                part_paths.append(part_path)
+
+            with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+                translated_paths = list(executor.map(
+                    lambda path: _translate_part(translator, path, target_lang, f"{os.path.splitext(path)[0]}_out.docx"),
+                    part_paths
+                ))
+
+            merge_parts(translated_paths, output_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return len(parts)
+
+
+def _relationships(package):
+    """
+    The document relationships as {Id: (Type, Target, TargetMode)}. Compared
+    instead of the raw .rels bytes, which differ with attribute order,
+    whitespace and XML declaration after a round trip through DeepL.
+    """
+    if DOCUMENT_RELS not in package.namelist():
+        return {}
+    root = ET.fromstring(package.read(DOCUMENT_RELS))
+    return {
+        rel.get("Id"): (rel.get("Type"), rel.get("Target"), rel.get("TargetMode", "Internal"))
+        for rel in root
+    }
+
+
+def merge_parts(part_paths, output_path):
+    """
+    Merges translated parts into one DOCX: the package of the first part with
+    the body blocks of all parts in order. Raises DocxMergeError (writing
+    nothing) if the parts' relationships differ, since then block references
+    such as images would not resolve in the merged document.
+    """
+    zips = [zipfile.ZipFile(path) for path in part_paths]
+    try:
+        rels = [_relationships(z) for z in zips]
+        for path, part_rels in zip(part_paths[1:], rels[1:]):
+            if part_rels != rels[0]:
+                raise DocxMergeError(
+                    f"Relationships of {os.path.basename(path)} differ from the first part; "
+                    "translate the document without splitting"
+                )
+
+        head, blocks, final_sectpr, tail = split_body(zips[0].read(DOCUMENT_XML).decode("utf-8"))
+        for z in zips[1:]:
+            blocks.extend(split_body(z.read(DOCUMENT_XML).decode("utf-8"))[1])
+
+        tmp_path = f"{output_path}.part"
+        _write_package(zips[0], tmp_path, head + "".join(blocks) + final_sectpr + tail)
+        os.replace(tmp_path, output_path)
+    finally:
+        for z in zips:
+            z.close()
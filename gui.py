@@ -1,12 +1,17 @@
 import os
 import threading
+from contextlib import nullcontext
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from backend import DeepLTranslator
+from backend import DeepLTranslator, output_path_for
+from key_pool import DeepLKeyPool, PooledDeepLTranslator
 from dotenv import load_dotenv
 from PIL import ImageGrab, Image
 import io
-from translation_result_window import TranslationResultWindow, OCRResultWindow
+from translation_result_window import TranslationResultWindow, OCRResultWindow, LayoutOCRResultWindow
+from ocr_pages import format_pages, is_multipage, iter_page_texts, translate_pages
+from ocr_layout import extract_blocks, format_blocks, translate_blocks
+from profiling import JobProfiler
 
 # Load env to get key if available
 load_dotenv()
@@ -23,14 +28,19 @@ class DeepLApp(ctk.CTk):
         ctk.set_default_color_theme("blue")
 
         # Variables
-        self.api_key_var = ctk.StringVar(value=os.getenv("DEEPL_API_KEY", ""))
+        self.api_key_var = ctk.StringVar(value=", ".join(DeepLKeyPool.env_keys()))
         self.file_path_var = ctk.StringVar()
         self.target_lang_var = ctk.StringVar(value="ID") # Default to Indonesian
         self.status_var = ctk.StringVar(value="Ready")
+        self.pack_cues_var = ctk.BooleanVar(value=False)
+        self.filter_cues_var = ctk.BooleanVar(value=False)
+        self.split_docx_var = ctk.BooleanVar(value=False)
+        self.profile_var = ctk.BooleanVar(value=False)
         
         # OCR Variables
         self.image_path_var = ctk.StringVar()
         self.ocr_lang_var = ctk.StringVar(value="eng+ind")
+        self.ocr_layout_var = ctk.BooleanVar(value=False)
         self.ocr_text = ""
         self.pasted_image = None
         
@@ -76,6 +86,22 @@ class DeepLApp(ctk.CTk):
         self.lang_menu = ctk.CTkOptionMenu(self.lang_frame, variable=self.target_lang_var, values=languages)
         self.lang_menu.pack(side="left", padx=10, pady=10)
 
+        # --- File Options ---
+        self.options_frame = ctk.CTkFrame(self)
+        self.options_frame.pack(pady=10, padx=20, fill="x")
+
+        self.pack_cues_check = ctk.CTkCheckBox(self.options_frame, text="Pack subtitle cues (fewer requests)", variable=self.pack_cues_var)
+        self.pack_cues_check.pack(side="left", padx=10, pady=10)
+
+        self.filter_cues_check = ctk.CTkCheckBox(self.options_frame, text="Skip untranslatable cues & tags", variable=self.filter_cues_var)
+        self.filter_cues_check.pack(side="left", padx=10, pady=10)
+
+        self.split_docx_check = ctk.CTkCheckBox(self.options_frame, text="Split large DOCX", variable=self.split_docx_var)
+        self.split_docx_check.pack(side="left", padx=10, pady=10)
+
+        self.profile_check = ctk.CTkCheckBox(self.options_frame, text="Profile job", variable=self.profile_var)
+        self.profile_check.pack(side="left", padx=10, pady=10)
+
         # --- OCR Section ---
         self.ocr_separator = ctk.CTkLabel(self, text="──────────── OR ────────────", font=("Roboto", 14))
         self.ocr_separator.pack(pady=10)
@@ -103,9 +129,12 @@ class DeepLApp(ctk.CTk):
         self.ocr_lang_label = ctk.CTkLabel(self.ocr_lang_frame, text="OCR Language:")
         self.ocr_lang_label.pack(side="left", padx=10)
         
-        ocr_languages = ["eng+ind", "eng", "ind", "jpn", "chi_sim", "chi_tra", "kor", "ara", "fra", "deu", "spa"]
+        ocr_languages = ["eng+ind", "auto", "eng", "ind", "jpn", "chi_sim", "chi_tra", "kor", "ara", "fra", "deu", "spa"]
         self.ocr_lang_menu = ctk.CTkOptionMenu(self.ocr_lang_frame, variable=self.ocr_lang_var, values=ocr_languages)
         self.ocr_lang_menu.pack(side="left", padx=10, pady=10)
+
+        self.ocr_layout_check = ctk.CTkCheckBox(self.ocr_lang_frame, text="Layout-aware (text blocks)", variable=self.ocr_layout_var)
+        self.ocr_layout_check.pack(side="left", padx=10, pady=10)
         
         # OCR Action Buttons
         self.ocr_action_frame = ctk.CTkFrame(self)
@@ -135,6 +164,27 @@ class DeepLApp(ctk.CTk):
         self.log_textbox.see("end")
         self.log_textbox.configure(state="disabled")
 
+    def create_translator(self, api_key):
+        """Several comma-separated keys are shared through a key pool."""
+        keys = [key.strip() for key in api_key.split(",") if key.strip()]
+        if len(keys) > 1:
+            self.log(f"Using a pool of {len(keys)} API keys")
+            return PooledDeepLTranslator(DeepLKeyPool(keys))
+        return DeepLTranslator(api_key)
+
+    def create_profiler(self, translator, output_path):
+        """Attaches a JobProfiler to the translator if "Profile job" is ticked"""
+        if not self.profile_var.get():
+            return None
+        translator.profiler = JobProfiler(output_path)
+        self.log("Profiling enabled (CPU and memory per stage)")
+        return translator.profiler
+
+    def log_profile(self, profiler):
+        if profiler is not None and profiler.bundle_path:
+            self.log(f"Profile saved to: {profiler.bundle_path}")
+            self.log(f"Summarize with: python profiling.py \"{profiler.bundle_path}\"")
+
     def select_file(self):
         filetypes = (
             ("All Supported", "*.srt *.txt *.docx *.pdf"),
@@ -169,8 +219,9 @@ class DeepLApp(ctk.CTk):
         self.log("-" * 30)
         self.log(f"Starting translation for {os.path.basename(filepath)} -> {target_lang}")
 
+        profiler = None
         try:
-            translator = DeepLTranslator(api_key)
+            translator = self.create_translator(api_key)
             
             # Validate key first (optional, but good for UX)
             valid, msg = translator.validate_api_key()
@@ -178,25 +229,23 @@ class DeepLApp(ctk.CTk):
                 raise Exception(f"Invalid API Key: {msg}")
             
             # Determine output path
-            directory = os.path.dirname(filepath)
-            filename = os.path.basename(filepath)
-            name, ext = os.path.splitext(filename)
-            output_filename = f"{name}_{target_lang}{ext}"
-            output_path = os.path.join(directory, output_filename)
+            output_path = output_path_for(filepath, target_lang)
             
-            self.log(f"Output will be saved to: {output_filename}")
+            self.log(f"Output will be saved to: {os.path.basename(output_path)}")
             
             # Dispatch based on extension
-            ext_lower = ext.lower()
-            if ext_lower == ".txt":
-                translator.translate_txt_file(filepath, target_lang, output_path)
-            elif ext_lower == ".srt":
-                translator.translate_srt_file(filepath, target_lang, output_path)
-            elif ext_lower in [".docx", ".pdf"]:
+            if filepath.lower().endswith((".docx", ".pdf")):
                 self.log("Uploading document...")
-                translator.translate_document(filepath, target_lang, output_path)
-            else:
-                raise Exception(f"Unsupported file format: {ext}")
+            profiler = self.create_profiler(translator, output_path)
+            with profiler or nullcontext():
+                stats = translator.translate_file(
+                    filepath, target_lang, output_path,
+                    pack_cues=self.pack_cues_var.get(),
+                    filter_cues=self.filter_cues_var.get(),
+                    split_docx=self.split_docx_var.get()
+                )
+            if stats is not None:
+                self.log(f"Cue filtering: {stats}")
             
             self.log("SUCCESS! Translation completed.")
             self.log(f"Saved to: {output_path}")
@@ -206,12 +255,14 @@ class DeepLApp(ctk.CTk):
             self.log(f"ERROR: {str(e)}")
             messagebox.showerror("Error", str(e))
         finally:
+            self.log_profile(profiler)
             self.action_btn.configure(state="normal", text="Translate File")
 
     def select_image(self):
         """Select an image file for OCR"""
         filetypes = (
-            ("Image Files", "*.png *.jpg *.jpeg *.bmp *.tiff *.gif"),
+            ("Image Files", "*.png *.jpg *.jpeg *.bmp *.tif *.tiff *.gif"),
+            ("Scanned PDF", "*.pdf"),
             ("All Files", "*.*")
         )
         filename = filedialog.askopenfilename(title="Select an image for OCR", filetypes=filetypes)
@@ -247,6 +298,25 @@ class DeepLApp(ctk.CTk):
             self.log(f"Error pasting image: {str(e)}")
             messagebox.showerror("Paste Error", str(e))
 
+    def extract_pages(self, image_path, ocr_lang):
+        """OCR every page of a multi-page TIFF or scanned PDF, in parallel"""
+        self.log(f"Processing pages of: {os.path.basename(image_path)}")
+        page_texts = []
+        for number, text in enumerate(iter_page_texts(image_path, ocr_lang), start=1):
+            self.log(f"Page {number}: {len(text)} characters")
+            page_texts.append(text)
+        return page_texts
+
+    def extract_blocks(self, image_path, ocr_lang):
+        """Layout-aware OCR of a single image into text blocks"""
+        if self.pasted_image:
+            self.log("Processing pasted image (layout-aware)...")
+        else:
+            self.log(f"Processing image (layout-aware): {os.path.basename(image_path)}")
+        blocks = extract_blocks(self.pasted_image or image_path, ocr_lang)
+        self.log(f"Found {len(blocks)} text blocks")
+        return blocks
+
     def start_ocr_thread(self):
         """Start OCR extraction in a separate thread"""
         threading.Thread(target=self.run_ocr, daemon=True).start()
@@ -274,16 +344,28 @@ class DeepLApp(ctk.CTk):
         self.log("-" * 30)
         self.log(f"Starting OCR with language: {ocr_lang}")
 
+        profiler = None
         try:
-            translator = DeepLTranslator(api_key)
+            translator = self.create_translator(api_key)
             
-            # Determine image source
-            if self.pasted_image:
-                self.log("Processing pasted image...")
-                extracted_text = translator.extract_text_from_image(self.pasted_image, lang=ocr_lang)
-            else:
-                self.log(f"Processing image: {os.path.basename(image_path)}")
-                extracted_text = translator.extract_text_from_image(image_path, lang=ocr_lang)
+            # For a pasted image, image_path only holds the "Image from clipboard" label
+            profiler = self.create_profiler(
+                translator, (None if self.pasted_image else image_path) or os.path.join(os.getcwd(), "pasted_image")
+            )
+            with profiler or nullcontext(), translator.profile_stage("ocr"):
+                # Determine image source
+                if self.ocr_layout_var.get() and (self.pasted_image or not is_multipage(image_path)):
+                    blocks = self.extract_blocks(image_path, ocr_lang)
+                    extracted_text = format_blocks(blocks)
+                elif self.pasted_image:
+                    self.log("Processing pasted image...")
+                    extracted_text = translator.extract_text_from_image(self.pasted_image, lang=ocr_lang)
+                elif is_multipage(image_path):
+                    page_texts = self.extract_pages(image_path, ocr_lang)
+                    extracted_text = format_pages(page_texts)
+                else:
+                    self.log(f"Processing image: {os.path.basename(image_path)}")
+                    extracted_text = translator.extract_text_from_image(image_path, lang=ocr_lang)
             
             if not extracted_text:
                 self.log("WARNING: No text found in the image.")
@@ -302,6 +384,7 @@ class DeepLApp(ctk.CTk):
             self.log(f"ERROR: {str(e)}")
             messagebox.showerror("OCR Error", str(e))
         finally:
+            self.log_profile(profiler)
             self.extract_btn.configure(state="normal", text="Extract Text")
             self.translate_ocr_btn.configure(state="normal")
 
@@ -325,46 +408,72 @@ class DeepLApp(ctk.CTk):
         self.log("-" * 30)
         self.log(f"Starting OCR + Translation: {ocr_lang} -> {target_lang}")
 
+        profiler = None
         try:
-            translator = DeepLTranslator(api_key)
+            translator = self.create_translator(api_key)
             
-            # Step 1: Extract text
-            if self.pasted_image:
-                self.log("Processing pasted image...")
-                extracted_text = translator.extract_text_from_image(self.pasted_image, lang=ocr_lang)
-            else:
-                self.log(f"Processing image: {os.path.basename(image_path)}")
-                extracted_text = translator.extract_text_from_image(image_path, lang=ocr_lang)
+            # For a pasted image, image_path only holds the "Image from clipboard" label
+            profiler = self.create_profiler(
+                translator, (None if self.pasted_image else image_path) or os.path.join(os.getcwd(), "pasted_image")
+            )
+            with profiler or nullcontext():
+                # Step 1: Extract text
+                page_texts = None
+                blocks = None
+                with translator.profile_stage("ocr"):
+                    if self.ocr_layout_var.get() and (self.pasted_image or not is_multipage(image_path)):
+                        blocks = self.extract_blocks(image_path, ocr_lang)
+                        extracted_text = format_blocks(blocks)
+                    elif self.pasted_image:
+                        self.log("Processing pasted image...")
+                        extracted_text = translator.extract_text_from_image(self.pasted_image, lang=ocr_lang)
+                    elif is_multipage(image_path):
+                        page_texts = self.extract_pages(image_path, ocr_lang)
+                        extracted_text = format_pages(page_texts)
+                    else:
+                        self.log(f"Processing image: {os.path.basename(image_path)}")
+                        extracted_text = translator.extract_text_from_image(image_path, lang=ocr_lang)
             
-            if not extracted_text:
-                self.log("WARNING: No text found in the image.")
-                messagebox.showwarning("No Text", "No text was detected in the image.")
-                return
+                if not extracted_text:
+                    self.log("WARNING: No text found in the image.")
+                    messagebox.showwarning("No Text", "No text was detected in the image.")
+                    return
             
-            self.ocr_text = extracted_text
-            self.log("Text extracted successfully!")
-            self.log("Original text:")
-            self.log("-" * 30)
-            self.log(extracted_text)
-            self.log("-" * 30)
+                self.ocr_text = extracted_text
+                self.log("Text extracted successfully!")
+                self.log("Original text:")
+                self.log("-" * 30)
+                self.log(extracted_text)
+                self.log("-" * 30)
             
-            # Step 2: Translate
-            self.log(f"Translating to {target_lang}...")
-            translated_texts = translator.translate_text_content([extracted_text], target_lang)
-            translated_text = translated_texts[0]
+                # Step 2: Translate
+                self.log(f"Translating to {target_lang}...")
+                if blocks:
+                    # All blocks go out packed as <c> elements, many per DeepL text, in one request
+                    translated_text = format_blocks(translate_blocks(translator, blocks, target_lang), translated=True)
+                elif page_texts:
+                    # All pages go out in packed batches instead of one request per page
+                    translated_text = format_pages(translate_pages(translator, page_texts, target_lang))
+                else:
+                    translated_texts = translator.translate_text_content([extracted_text], target_lang)
+                    translated_text = translated_texts[0]
             
-            self.log("SUCCESS! Translation completed:")
-            self.log("-" * 30)
-            self.log(translated_text)
-            self.log("-" * 30)
+                self.log("SUCCESS! Translation completed:")
+                self.log("-" * 30)
+                self.log(translated_text)
+                self.log("-" * 30)
             
             # Show beautiful result window
-            OCRResultWindow(self, extracted_text, translated_text, ocr_lang, target_lang)
+            if blocks:
+                LayoutOCRResultWindow(self, blocks, ocr_lang, target_lang)
+            else:
+                OCRResultWindow(self, extracted_text, translated_text, ocr_lang, target_lang)
 
         except Exception as e:
             self.log(f"ERROR: {str(e)}")
             messagebox.showerror("Error", str(e))
         finally:
+            self.log_profile(profiler)
             self.extract_btn.configure(state="normal")
             self.translate_ocr_btn.configure(state="normal", text="Extract & Translate")
 
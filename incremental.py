@@ -0,0 +1,118 @@
+"""
+Incremental re-translation of edited SRT files.
+
+Given a new source SRT and the previous source/translation pair, cues are
+aligned by content and timing so that unchanged lines keep their existing
+translation (with the new timestamps) and only edited or new cues are sent to
+DeepL. A pure retime needs no API calls at all.
+"""
+import re
+from collections import defaultdict
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_cue_text(text):
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+
+def pair_previous(old_source, old_translation):
+    """
+    Maps each row of the previous source to its translated text.
+
+    Translated files are written from the source store, so normally rows line
+    up one to one. If cues were skipped or reordered when writing, rows are
+    paired by their (start, end) timing instead. Returns a list with None for
+    source rows that have no translation.
+    """
+    if len(old_source) == len(old_translation) and all(
+        old_source.starts[i] == old_translation.starts[i] and old_source.ends[i] == old_translation.ends[i]
+        for i in range(len(old_source))
+    ):
+        return list(old_translation.iter_texts())
+
+    by_timing = defaultdict(list)
+    for row in range(len(old_translation) - 1, -1, -1):
+        by_timing[(old_translation.starts[row], old_translation.ends[row])].append(row)
+
+    paired = []
+    for row in range(len(old_source)):
+        rows = by_timing.get((old_source.starts[row], old_source.ends[row]))
+        paired.append(old_translation.text(rows.pop()) if rows else None)
+    return paired
+
+
+def estimate_shift(cues, old_source):
+    """
+    Median timing offset (ms) between cues whose text occurs exactly once in
+    both files, i.e. the global re-sync applied to the new file.
+    """
+    new_rows = defaultdict(list)
+    for row, text in enumerate(cues.iter_texts()):
+        new_rows[normalize_cue_text(text)].append(row)
+    old_rows = defaultdict(list)
+    for row, text in enumerate(old_source.iter_texts()):
+        old_rows[normalize_cue_text(text)].append(row)
+
+    offsets = sorted(
+        cues.starts[rows[0]] - old_source.starts[old_rows[text][0]]
+        for text, rows in new_rows.items()
+        if len(rows) == 1 and len(old_rows.get(text, ())) == 1
+    )
+    return offsets[len(offsets) // 2] if offsets else 0
+
+
+def align_previous_translations(cues, old_source, old_translation):
+    """
+    Finds a reusable translation for every cue in the new source store.
+
+    A new cue reuses an old translation when its normalized text matches an
+    old source cue. When the same text occurs several times, the old cue
+    closest in time is chosen, after correcting for the shift seen on the last
+    match (starting from estimate_shift), so a global re-sync still aligns
+    line for line. Returns a list with
+    the carried-over translation, or None where the cue must be translated.
+    """
+    previous = pair_previous(old_source, old_translation)
+
+    candidates = defaultdict(list)
+    for row, text in enumerate(old_source.iter_texts()):
+        if previous[row] is not None:
+            candidates[normalize_cue_text(text)].append(row)
+
+    carried = []
+    shift = estimate_shift(cues, old_source)
+    for row, text in enumerate(cues.iter_texts()):
+        rows = candidates.get(normalize_cue_text(text))
+        if not rows:
+            carried.append(None)
+            continue
+        start = cues.starts[row]
+        best = min(range(len(rows)), key=lambda i: abs(old_source.starts[rows[i]] + shift - start))
+        old_row = rows.pop(best)
+        shift = start - old_source.starts[old_row]
+        carried.append(previous[old_row])
+    return carried
+
+
+class IncrementalStats:
+    """How many cues were carried over versus sent to DeepL."""
+
+    def __init__(self, reused, translated):
+        self.reused = reused
+        self.translated = translated
+
+    def __str__(self):
+        return f"{self.reused} cues reused, {self.translated} cues translated"
+
+
+def merge_translations(carried, translate_texts, texts):
+    """
+    Yields the final cue texts: carried translations where available, and the
+    output of translate_texts (called once, on the remaining source texts in
+    order) everywhere else.
+    """
+    missing = (text for text, done in zip(texts, carried) if done is None)
+    fresh = iter(translate_texts(missing))
+    for done in carried:
+        yield done if done is not None else next(fresh)
@@ -0,0 +1,254 @@
+"""
+Sharding and failover across several DeepL API keys.
+
+DeepLKeyPool holds one DeepLTranslator per key (Free keys talk to
+api-free.deepl.com, Pro keys to api.deepl.com, side by side) and picks a key
+for every request, weighted by the quota left according to /usage and by how
+many 429s the key returned recently. Keys that run out of quota or are
+rejected are drained; keys that keep failing are cooled down for a while.
+Either way their work fails over to the remaining keys.
+
+PooledDeepLTranslator implements the BaseTranslator transport methods on top
+of a pool, so SRT/TXT/document translation spreads across keys unchanged.
+translator_from_env builds whichever of the two DEEPL_API_KEYS calls for.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+
+from backend import BaseTranslator, DeepLTranslator
+
+# Weight used for keys whose quota is unknown or effectively unlimited (Pro)
+DEFAULT_QUOTA_WEIGHT = 500000
+
+# A 429 counts against a key for this many seconds
+RATE_LIMIT_WINDOW = 60
+
+# Consecutive failures after which a key is cooled down, and for how long
+MAX_CONSECUTIVE_FAILURES = 3
+COOLDOWN_SECONDS = 120
+
+# When every key failed an operation, wait and go round again this many times
+FAILOVER_ROUNDS = 3
+
+# Responses that mean the key itself is unusable: 403 bad key, 456 quota exceeded
+DRAIN_STATUS_CODES = {403, 456}
+# Responses worth retrying on another key
+FAILOVER_STATUS_CODES = {429, 500, 502, 503, 504, 529}
+
+
+def _status_code(error):
+    """Finds the HTTP status behind a (possibly wrapped) request exception."""
+    while error is not None:
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            return error.response.status_code
+        if isinstance(error, requests.exceptions.RetryError):
+            return 429 if "429" in str(error) else 503
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return 503
+        error = error.__cause__
+    return None
+
+
+class KeyState:
+    """Book-keeping for one key in the pool."""
+    __slots__ = ("translator", "remaining", "answered", "rate_limited", "failures", "drained", "cooldown_until",
+                 "in_flight")
+
+    def __init__(self, translator):
+        self.translator = translator
+        self.remaining = None
+        self.answered = False  # /usage succeeded on the last refresh
+        self.rate_limited = deque()
+        self.failures = 0
+        self.drained = False
+        self.cooldown_until = 0
+        self.in_flight = 0
+
+    @property
+    def label(self):
+        key = self.translator.api_key
+        return f"...{key[-6:]}"
+
+    def weight(self, now):
+        while self.rate_limited and self.rate_limited[0] < now - RATE_LIMIT_WINDOW:
+            self.rate_limited.popleft()
+        quota = DEFAULT_QUOTA_WEIGHT if self.remaining is None else min(self.remaining, DEFAULT_QUOTA_WEIGHT)
+        return max(quota, 1) / (1 + 4 * len(self.rate_limited)) / (1 + self.in_flight)
+
+
+class DeepLKeyPool:
+    def __init__(self, api_keys, usage_refresh=300, max_retries=1, base_url=None):
+        """
+        Args:
+            api_keys: DeepL API keys, Free (":fx") and Pro may be mixed
+            usage_refresh: Seconds between /usage refreshes of the quota weights
+            max_retries: HTTP-level retries per key before failing over
+            base_url: DeepL API base URL for every key, e.g. a local stand-in
+        """
+        if not api_keys:
+            raise ValueError("No API keys given for the key pool.")
+        self.keys = [
+            KeyState(DeepLTranslator(key, max_retries=max_retries, base_url=base_url)) for key in api_keys
+        ]
+        self.usage_refresh = usage_refresh
+        self._last_refresh = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def env_keys():
+        """Keys from DEEPL_API_KEYS (comma separated), falling back to DEEPL_API_KEY."""
+        keys = os.getenv("DEEPL_API_KEYS") or os.getenv("DEEPL_API_KEY") or ""
+        return [key.strip() for key in keys.split(",") if key.strip()]
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Builds a pool from DEEPL_API_KEYS or DEEPL_API_KEY."""
+        return cls(cls.env_keys(), **kwargs)
+
+    def refresh_usage(self):
+        """Updates the remaining quota of every key from /usage."""
+        for state in self.keys:
+            if state.drained:
+                continue
+            valid, usage = state.translator.validate_api_key()
+            with self._lock:
+                state.answered = valid
+                if not valid:
+                    state.failures += 1
+                    continue
+                limit = usage.get("character_limit")
+                count = usage.get("character_count", 0)
+                state.remaining = None if not limit else limit - count
+                if state.remaining is not None and state.remaining <= 0:
+                    self._drain(state, "character quota used up")
+        self._last_refresh = time.monotonic()
+
+    def usage(self):
+        """Returns (label, remaining, drained) for every key."""
+        return [(state.label, state.remaining, state.drained) for state in self.keys]
+
+    def _drain(self, state, reason):
+        state.drained = True
+        print(f"[DEBUG] Key pool: draining key {state.label}: {reason}")
+
+    def _acquire(self, exclude):
+        now = time.monotonic()
+        with self._lock:
+            usable = [
+                state for state in self.keys
+                if not state.drained and state.cooldown_until <= now and state not in exclude
+            ]
+            if not usable:
+                # Cooled-down keys are better than giving up
+                usable = [state for state in self.keys if not state.drained and state not in exclude]
+            if not usable:
+                return None
+            state = random.choices(usable, weights=[s.weight(now) for s in usable])[0]
+            state.in_flight += 1
+            return state
+
+    def _release(self, state, error=None, chars=0):
+        with self._lock:
+            state.in_flight -= 1
+            if error is None:
+                state.failures = 0
+                if state.remaining is not None:
+                    state.remaining -= chars
+                return True
+
+            status = _status_code(error)
+            if status in DRAIN_STATUS_CODES:
+                self._drain(state, f"HTTP {status}")
+                return True
+            if status in FAILOVER_STATUS_CODES:
+                if status == 429:
+                    state.rate_limited.append(time.monotonic())
+                state.failures += 1
+                if state.failures >= MAX_CONSECUTIVE_FAILURES:
+                    state.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+                    state.failures = 0
+                    print(f"[DEBUG] Key pool: cooling down key {state.label} for {COOLDOWN_SECONDS}s")
+                return True
+            # Anything else (bad request, parse error, ...) is not the key's fault
+            return False
+
+    def run(self, operation, chars=0):
+        """
+        Runs operation(translator) on a key from the pool, failing over to the
+        other keys on quota, auth, rate-limit and server errors.
+        """
+        if time.monotonic() - self._last_refresh > self.usage_refresh:
+            self._last_refresh = time.monotonic()
+            self.refresh_usage()
+
+        tried = set()
+        last_error = None
+        rounds = 1
+        while True:
+            state = self._acquire(tried)
+            if state is None and rounds < FAILOVER_ROUNDS and not all(s.drained for s in self.keys):
+                # Every live key failed once (e.g. all rate limited): back off and retry
+                time.sleep(2 ** rounds)
+                rounds += 1
+                tried.clear()
+                continue
+            if state is None:
+                raise Exception(f"All DeepL API keys are exhausted or failing. Last error: {last_error}")
+            try:
+                result = operation(state.translator)
+            except Exception as e:
+                if not self._release(state, e):
+                    raise
+                print(f"[DEBUG] Key pool: key {state.label} failed ({e}), failing over")
+                tried.add(state)
+                last_error = e
+                continue
+            self._release(state, chars=chars)
+            return result
+
+
+class PooledDeepLTranslator(BaseTranslator):
+    """Translator that sends every request through a DeepLKeyPool."""
+
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+
+    def validate_api_key(self):
+        """Valid if at least one key answered /usage and still has quota."""
+        self.pool.refresh_usage()
+        if not any(state.answered and not state.drained for state in self.pool.keys):
+            return False, "No usable API key in the pool"
+        return True, {"keys": self.pool.usage()}
+
+    def translate_text_content(self, text, target_lang, **options):
+        chars = len(text) if isinstance(text, str) else sum(len(t) for t in text)
+
+        def attempt(translator):
+            # Every failover attempt is a request of its own
+            self._count_text_request()
+            return translator.translate_text_content(text, target_lang, **options)
+
+        with self.profile_stage("http"):
+            return self.pool.run(attempt, chars=chars)
+
+    def _translate_document_job(self, filepath, target_lang, output_path):
+        # Upload, polling and download must all use the same key. Split DOCX
+        # parts each come through here, so parts spread across keys.
+        self.pool.run(lambda translator: translator._translate_document_job(filepath, target_lang, output_path))
+
+
+def translator_from_env(base_url=None):
+    """
+    DeepLTranslator for a single key in DEEPL_API_KEYS / DEEPL_API_KEY, or a
+    PooledDeepLTranslator sharing them when there are several.
+    """
+    keys = DeepLKeyPool.env_keys()
+    if len(keys) > 1:
+        return PooledDeepLTranslator(DeepLKeyPool(keys, base_url=base_url))
+    return DeepLTranslator(keys[0] if keys else None, base_url=base_url)
@@ -0,0 +1,136 @@
+"""
+Script and orientation detection to pick a single Tesseract language model.
+
+Tesseract is noticeably slower with several language models loaded
+("eng+ind", "eng+jpn", ...), and the wrong model produces garbage. In auto
+mode a fast orientation and script detection (OSD) pass runs first; the
+detected script picks one installed language model, the image is rotated
+upright if needed, and the combined fallback models are only used when the
+detection is not confident. Results are cached per image.
+
+Requires Tesseract's osd.traineddata; without it auto mode always uses the
+fallback languages.
+"""
+import hashlib
+import time
+
+import pytesseract
+
+# Tesseract script names (as reported by OSD) -> language model
+SCRIPT_LANGS = {
+    "Latin": "eng",
+    "Cyrillic": "rus",
+    "Greek": "ell",
+    "Arabic": "ara",
+    "Hebrew": "heb",
+    "Devanagari": "hin",
+    "Thai": "tha",
+    "Han": "chi_sim",
+    "HanS": "chi_sim",
+    "HanT": "chi_tra",
+    "Japanese": "jpn",
+    "Katakana": "jpn",
+    "Hiragana": "jpn",
+    "Hangul": "kor",
+    "Korean": "kor",
+}
+
+# Language models grouped by the script they read
+LANG_SCRIPTS = {
+    "eng": "Latin", "ind": "Latin", "fra": "Latin", "deu": "Latin", "spa": "Latin",
+    "ita": "Latin", "por": "Latin", "nld": "Latin", "vie": "Latin", "msa": "Latin",
+    "rus": "Cyrillic", "ukr": "Cyrillic", "ell": "Greek", "ara": "Arabic", "heb": "Hebrew",
+    "hin": "Devanagari", "tha": "Thai", "chi_sim": "Han", "chi_tra": "Han",
+    "jpn": "Japanese", "kor": "Hangul",
+}
+SCRIPT_ALIASES = {"HanS": "Han", "HanT": "Han", "Katakana": "Japanese", "Hiragana": "Japanese", "Korean": "Hangul"}
+
+# OSD confidences below these are treated as unreliable
+MIN_SCRIPT_CONFIDENCE = 2.0
+MIN_ORIENTATION_CONFIDENCE = 2.0
+
+# Detections are cached per image fingerprint, oldest dropped first
+MAX_CACHED_DETECTIONS = 512
+_cache = {}
+_installed_langs = None
+
+
+class LangDetection:
+    """Outcome of the OSD pass for one image."""
+    __slots__ = ("lang", "rotate", "script", "confidence", "fallback", "seconds")
+
+    def __init__(self, lang, rotate=0, script=None, confidence=0.0, fallback=False, seconds=0.0):
+        self.lang = lang
+        self.rotate = rotate
+        self.script = script
+        self.confidence = confidence
+        self.fallback = fallback
+        self.seconds = seconds
+
+    def __str__(self):
+        source = "fallback" if self.fallback else f"script {self.script}, confidence {self.confidence:.1f}"
+        rotated = f", rotated {self.rotate}°" if self.rotate else ""
+        return f"{self.lang} ({source}{rotated}, OSD {self.seconds:.2f}s)"
+
+
+def installed_languages():
+    global _installed_langs
+    if _installed_langs is None:
+        try:
+            _installed_langs = set(pytesseract.get_languages(config=""))
+        except Exception:
+            _installed_langs = set()
+    return _installed_langs
+
+
+def _fingerprint(image):
+    thumb = image.convert("L").resize((64, 64))
+    return hashlib.md5(thumb.tobytes() + repr(image.size).encode()).hexdigest()
+
+
+def _remember(key, detection):
+    _cache[key] = detection
+    if len(_cache) > MAX_CACHED_DETECTIONS:
+        del _cache[next(iter(_cache))]
+    return detection
+
+
+def _pick_lang(script, fallback_lang):
+    """A single model for the script: preferably one of the fallback's, else the default one."""
+    script = SCRIPT_ALIASES.get(script, script)
+    installed = installed_languages()
+    # Latin-script models share the alphabet, so the first requested one is enough
+    for lang in fallback_lang.split("+"):
+        if LANG_SCRIPTS.get(lang) == script and (not installed or lang in installed):
+            return lang
+    lang = SCRIPT_LANGS.get(script)
+    if lang and lang in installed:
+        return lang
+    return None
+
+
+def detect_ocr_language(image, fallback_lang="eng+ind"):
+    """
+    Runs OSD on a PIL image and returns a LangDetection with the language
+    model to use and the clockwise rotation needed to make the text upright.
+    """
+    key = (_fingerprint(image), fallback_lang)
+    if key in _cache:
+        return _cache[key]
+
+    started = time.perf_counter()
+    try:
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+    except Exception as e:
+        # No osd.traineddata, or too little text to detect anything
+        print(f"[DEBUG] OSD failed ({str(e).strip()}), using {fallback_lang}")
+        return _remember(key, LangDetection(fallback_lang, fallback=True, seconds=time.perf_counter() - started))
+
+    rotate = osd.get("rotate", 0) if osd.get("orientation_conf", 0) >= MIN_ORIENTATION_CONFIDENCE else 0
+    script = osd.get("script")
+    confidence = osd.get("script_conf", 0.0)
+    lang = _pick_lang(script, fallback_lang) if confidence >= MIN_SCRIPT_CONFIDENCE else None
+    return _remember(key, LangDetection(
+        lang or fallback_lang, rotate, script, confidence,
+        fallback=lang is None, seconds=time.perf_counter() - started
+    ))
@@ -0,0 +1,162 @@
+"""
+Layout-aware OCR: text blocks with coordinates instead of one flat string.
+
+image_to_string reads a multi-column screenshot line by line across the
+columns, and the GUI then sent the whole result as one DeepL text. Here the
+word boxes from image_to_data are grouped into Tesseract's blocks and
+paragraphs:
+
+- words below MIN_WORD_CONFIDENCE (speckles, icons, UI chrome) are dropped
+- lines of a paragraph are joined into running text, re-joining words
+  hyphenated at the line end
+- every block and every paragraph keeps its bounding box, so results can be
+  shown per region
+- all paragraphs are translated together as one packed batch (see
+  BaseTranslator.iter_translations): each paragraph becomes a <c> element, so
+  a heading is never run into the sentence below it, many paragraphs share
+  one DeepL text element, and a screenshot needs one request
+"""
+import re
+
+import pytesseract
+
+from backend import DeepLTranslator
+
+# Tesseract word confidence (0-100); lower-scoring words are usually noise
+MIN_WORD_CONFIDENCE = 60
+
+# Tesseract's image_to_data level for single words
+WORD_LEVEL = 5
+
+HYPHENATED_RE = re.compile(r"\w-$")
+
+
+class OCRRegion:
+    """Bounding box of an OCR result, grown word by word."""
+    __slots__ = ("left", "top", "right", "bottom")
+
+    def __init__(self):
+        self.left = self.top = self.right = self.bottom = None
+
+    @property
+    def box(self):
+        """(left, top, width, height) in image pixels."""
+        return self.left, self.top, self.right - self.left, self.bottom - self.top
+
+    def extend_box(self, left, top, width, height):
+        self.left = left if self.left is None else min(self.left, left)
+        self.top = top if self.top is None else min(self.top, top)
+        self.right = left + width if self.right is None else max(self.right, left + width)
+        self.bottom = top + height if self.bottom is None else max(self.bottom, top + height)
+
+
+class OCRParagraph(OCRRegion):
+    """One paragraph: its running text, bounding box and (once translated) translation."""
+    __slots__ = ("text", "translation")
+
+    def __init__(self):
+        super().__init__()
+        self.text = ""
+        self.translation = None
+
+
+class OCRBlock(OCRRegion):
+    """One text block: its OCRParagraphs, bounding box and mean word confidence."""
+    __slots__ = ("number", "paragraphs", "confidence")
+
+    def __init__(self, number):
+        super().__init__()
+        self.number = number
+        self.paragraphs = []
+        self.confidence = 0.0
+
+    @property
+    def text(self):
+        return "\n".join(p.text for p in self.paragraphs)
+
+    @property
+    def translation(self):
+        """Paragraph translations, one per line; None until translated."""
+        if any(p.translation is None for p in self.paragraphs):
+            return None
+        return "\n".join(p.translation for p in self.paragraphs)
+
+
+def _join_lines(lines):
+    """Joins the lines of a paragraph into running text."""
+    text = ""
+    for line in lines:
+        if HYPHENATED_RE.search(text):
+            text = text[:-1] + line
+        else:
+            text = f"{text} {line}" if text else line
+    return text
+
+
+def group_words(data, min_confidence=MIN_WORD_CONFIDENCE):
+    """
+    Groups an image_to_data result (Output.DICT) into OCRBlocks, in
+    Tesseract's reading order. Blocks left without confident words are dropped.
+    """
+    blocks = {}
+    paragraphs = {}  # (page, block, paragraph) -> OCRParagraph
+    lines = {}  # (page, block, paragraph) -> {line: [words]}
+    confidences = {}
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        confidence = float(data["conf"][i])
+        if data["level"][i] != WORD_LEVEL or not word or confidence < min_confidence:
+            continue
+        key = (data["page_num"][i], data["block_num"][i])
+        block = blocks.get(key)
+        if block is None:
+            block = blocks[key] = OCRBlock(len(blocks) + 1)
+        paragraph_key = key + (data["par_num"][i],)
+        paragraph = paragraphs.get(paragraph_key)
+        if paragraph is None:
+            paragraph = paragraphs[paragraph_key] = OCRParagraph()
+            block.paragraphs.append(paragraph)
+        box = data["left"][i], data["top"][i], data["width"][i], data["height"][i]
+        block.extend_box(*box)
+        paragraph.extend_box(*box)
+        confidences.setdefault(key, []).append(confidence)
+        lines.setdefault(paragraph_key, {}).setdefault(data["line_num"][i], []).append(word)
+
+    for paragraph_key, paragraph in paragraphs.items():
+        paragraph.text = _join_lines(" ".join(words) for words in lines[paragraph_key].values())
+    for key, block in blocks.items():
+        block.confidence = sum(confidences[key]) / len(confidences[key])
+    return list(blocks.values())
+
+
+def extract_blocks(image_path_or_pil, lang='eng+ind', min_confidence=MIN_WORD_CONFIDENCE):
+    """
+    OCRs an image into text blocks with coordinates.
+
+    Args:
+        image_path_or_pil: Either a file path (str) or a PIL Image object
+        lang: Tesseract language(s), including 'auto'
+        min_confidence: Words scoring below this are dropped as noise
+    """
+    image, lang = DeepLTranslator.prepare_ocr_image(image_path_or_pil, lang)
+    try:
+        data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+    except pytesseract.TesseractNotFoundError:
+        raise Exception("Tesseract OCR not found! Please install Tesseract OCR first.\n\nDownload from: https://github.com/UB-Mannheim/tesseract/wiki")
+    blocks = group_words(data, min_confidence)
+    print(f"[DEBUG] Layout OCR: {len(blocks)} blocks, {sum(len(b.text) for b in blocks)} characters")
+    return blocks
+
+
+def translate_blocks(translator, blocks, target_lang):
+    """Translates all paragraphs as one packed batch, storing each paragraph's translation."""
+    paragraphs = [p for block in blocks for p in block.paragraphs]
+    translations = translator.iter_translations((p.text for p in paragraphs), target_lang, pack=True)
+    for paragraph, translation in zip(paragraphs, translations):
+        paragraph.translation = translation
+    return blocks
+
+
+def format_blocks(blocks, translated=False):
+    """Joins block texts (or translations) with blank lines, for display."""
+    return "\n\n".join(b.translation if translated else b.text for b in blocks)
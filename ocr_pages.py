@@ -0,0 +1,110 @@
+"""
+Parallel multi-page OCR for TIFF stacks and scanned PDFs.
+
+Image.open only exposes the first frame of a multi-page TIFF, and image-only
+PDFs cannot be read by the Document API at all. Here pages are OCR'd one by
+one on a process pool:
+
+- pages are identified by (path, index) and loaded inside the worker, so
+  only the pages currently being OCR'd are in memory (TIFF frames are seeked
+  to, PDF pages rendered on demand with PyMuPDF)
+- at most 2 x workers pages are in flight at any time
+- page texts come back in page order
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from backend import DeepLTranslator
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None  # PyMuPDF not installed, PDFs cannot be rendered for OCR
+
+# Rendering resolution for PDF pages; 300 DPI is what Tesseract is tuned for
+PDF_DPI = 300
+
+MULTIPAGE_IMAGE_EXTENSIONS = (".tif", ".tiff", ".gif", ".webp")
+
+
+def _require_pymupdf():
+    if pymupdf is None:
+        raise Exception("PDF OCR requires PyMuPDF. Install it with: pip install pymupdf")
+
+
+def count_pages(path):
+    """Number of pages (PDF) or frames (TIFF and other image stacks)."""
+    if path.lower().endswith(".pdf"):
+        _require_pymupdf()
+        with pymupdf.open(path) as doc:
+            return doc.page_count
+    with Image.open(path) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def is_multipage(path):
+    """True for PDFs and for image files with more than one frame."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        return True
+    if ext in MULTIPAGE_IMAGE_EXTENSIONS:
+        return count_pages(path) > 1
+    return False
+
+
+def load_page(path, index, dpi=PDF_DPI):
+    """Loads a single page as a PIL image, without touching the other pages."""
+    if path.lower().endswith(".pdf"):
+        _require_pymupdf()
+        with pymupdf.open(path) as doc:
+            pixmap = doc[index].get_pixmap(dpi=dpi, alpha=False)
+            return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    with Image.open(path) as image:
+        image.seek(index)
+        return image.copy()
+
+
+def ocr_page(path, index, lang, dpi=PDF_DPI):
+    """OCRs one page; runs inside the worker processes."""
+    return DeepLTranslator.extract_text_from_image(load_page(path, index, dpi), lang)
+
+
+def iter_page_texts(path, lang='eng+ind', workers=None, dpi=PDF_DPI):
+    """
+    Yields the OCR text of every page in order, OCR'ing pages concurrently.
+
+    Args:
+        path: Multi-page TIFF or (scanned) PDF
+        lang: Tesseract language(s)
+        workers: Worker processes (default: CPU count)
+        dpi: Rendering resolution for PDF pages
+    """
+    page_count = count_pages(path)
+    workers = workers or os.cpu_count() or 1
+    window = 2 * workers
+
+    with ProcessPoolExecutor(max_workers=min(workers, page_count)) as executor:
+        pending = []
+        next_page = 0
+        while next_page < page_count or pending:
+            while next_page < page_count and len(pending) < window:
+                pending.append(executor.submit(ocr_page, path, next_page, lang, dpi))
+                next_page += 1
+            yield pending.pop(0).result()
+
+
+def translate_pages(translator, page_texts, target_lang):
+    """
+    Translates OCR'd pages in packed batches: many pages per DeepL text element
+    and request, instead of one request per page.
+    """
+    return list(translator.iter_translations(page_texts, target_lang, pack=True))
+
+
+def format_pages(page_texts):
+    """Joins page texts with page markers, for display."""
+    return "\n\n".join(
+        f"--- Page {number} ---\n{text}" for number, text in enumerate(page_texts, start=1)
+    )
@@ -0,0 +1,249 @@
+"""
+Opt-in profiling of translation and OCR jobs.
+
+A JobProfiler attached to a translator (translator.profiler = JobProfiler(...))
+records, per job stage:
+
+- a cProfile CPU profile
+- wall time and how often the stage was entered
+- the peak traced memory (tracemalloc), plus a snapshot of the allocations
+  still held at the end of the stage run with the highest peak
+
+Stages are parse, batch, http, compose, write and ocr. Nested stages are
+exclusive: while an http request runs inside batch, its time and calls go
+to http only. Only the thread that runs the job is profiled; work done on
+worker threads or processes (parallel DOCX parts, multi-page OCR) shows up
+as time spent waiting in the calling stage.
+
+When the job ends, everything is saved as a timestamped bundle directory next
+to the output file, e.g. video_ID.srt.profile-20250101-120000/, which can be
+summarized with:
+
+    python profiling.py video_ID.srt.profile-20250101-120000 [--top 15]
+"""
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+STAGES = ("parse", "batch", "http", "compose", "write", "ocr")
+SUMMARY_FILENAME = "summary.json"
+
+# Frames kept per allocation traceback
+TRACEMALLOC_FRAMES = 10
+
+
+def bundle_path_for(output_path, started=None):
+    """Bundle directory next to the output: <output>.profile-YYYYmmdd-HHMMSS"""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started))
+    return f"{output_path}.profile-{stamp}"
+
+
+def _format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class StageStats:
+    """Everything recorded for one stage."""
+    __slots__ = ("name", "profile", "seconds", "calls", "peak_bytes", "snapshot")
+
+    def __init__(self, name):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.seconds = 0.0
+        self.calls = 0
+        self.peak_bytes = 0
+        self.snapshot = None
+
+
+class JobProfiler:
+    def __init__(self, output_path, job=None, memory=True):
+        """
+        Args:
+            output_path: Output file of the job; the bundle is saved next to it
+            job: Description stored in the report (default: output file name)
+            memory: Trace allocations with tracemalloc (slows the job down noticeably)
+        """
+        self.output_path = output_path
+        self.job = job or os.path.basename(output_path)
+        self.memory = memory
+        self.stages = {}
+        self.bundle_path = None
+        self._stack = []
+        self._thread = None
+        self._started = None
+        self._seconds = 0.0
+        self._owns_tracemalloc = False
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        self._started = time.time()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._owns_tracemalloc = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._seconds = time.time() - self._started
+        try:
+            self.save(error=repr(exc) if exc is not None else None)
+        finally:
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+        return False
+
+    def _stage_stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        return stats
+
+    def _record_peak(self, stats):
+        """Folds the peak since the last reset into stats; True if it is a new maximum."""
+        if not tracemalloc.is_tracing():
+            return False
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        if peak > stats.peak_bytes:
+            stats.peak_bytes = peak
+            return True
+        return False
+
+    @contextmanager
+    def stage(self, name):
+        """Profiles the enclosed code as stage `name`; a no-op outside the job's thread."""
+        if threading.get_ident() != self._thread:
+            yield
+            return
+
+        outer = self._stack[-1] if self._stack else None
+        if outer is not None:
+            outer.profile.disable()
+            self._record_peak(outer)
+        stats = self._stage_stats(name)
+        stats.calls += 1
+        self._stack.append(stats)
+        started = time.perf_counter()
+        stats.profile.enable()
+        try:
+            yield
+        finally:
+            stats.profile.disable()
+            elapsed = time.perf_counter() - started
+            stats.seconds += elapsed
+            if self._record_peak(stats):
+                stats.snapshot = tracemalloc.take_snapshot()
+            self._stack.pop()
+            if outer is not None:
+                # The outer stage keeps its own exclusive time only
+                outer.seconds -= elapsed
+                outer.profile.enable()
+
+    def iter_stage(self, name, iterable):
+        """
+        Yields from iterable, profiling only the time spent producing each
+        item as stage `name`, so streaming pipelines can be split into stages.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def save(self, error=None):
+        """Writes the bundle: <stage>.prof, <stage>.snapshot and summary.json."""
+        self.bundle_path = bundle_path_for(self.output_path, self._started)
+        os.makedirs(self.bundle_path, exist_ok=True)
+        summary = {
+            "job": self.job,
+            "output": self.output_path,
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._started)),
+            "seconds": self._seconds,
+            "error": error,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "memory_traced": self.memory,
+            "stages": {},
+        }
+        for name, stats in self.stages.items():
+            stats.profile.dump_stats(os.path.join(self.bundle_path, f"{name}.prof"))
+            if stats.snapshot is not None:
+                stats.snapshot.dump(os.path.join(self.bundle_path, f"{name}.snapshot"))
+            summary["stages"][name] = {
+                "seconds": stats.seconds,
+                "calls": stats.calls,
+                "peak_bytes": stats.peak_bytes,
+            }
+        with open(os.path.join(self.bundle_path, SUMMARY_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=1)
+        print(f"[DEBUG] Profile saved to {self.bundle_path}")
+        return self.bundle_path
+
+
+def _stage_order(name):
+    return STAGES.index(name) if name in STAGES else len(STAGES)
+
+
+def print_report(bundle_path, top=10, out=sys.stdout):
+    """Prints the stage overview, the CPU hotspots and the largest allocation sites."""
+    with open(os.path.join(bundle_path, SUMMARY_FILENAME), "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    stages = sorted(summary["stages"].items(), key=lambda item: _stage_order(item[0]))
+
+    print(f"Job:     {summary['job']}", file=out)
+    print(f"Started: {summary['started']}  ({summary['seconds']:.2f}s total, Python {summary['python']})", file=out)
+    if summary.get("error"):
+        print(f"Failed:  {summary['error']}", file=out)
+    print(file=out)
+    print(f"{'Stage':<10}{'Time':>10}{'Share':>8}{'Calls':>8}{'Peak memory':>14}", file=out)
+    for name, stage in stages:
+        share = stage["seconds"] / summary["seconds"] * 100 if summary["seconds"] else 0
+        peak = _format_bytes(stage["peak_bytes"]) if summary["memory_traced"] else "-"
+        print(f"{name:<10}{stage['seconds']:>9.2f}s{share:>7.1f}%{stage['calls']:>8}{peak:>14}", file=out)
+
+    for name, _ in stages:
+        profile_path = os.path.join(bundle_path, f"{name}.prof")
+        if not os.path.exists(profile_path):
+            continue
+        functions = pstats.Stats(profile_path).stats
+        hotspots = sorted(functions.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        print(f"\n[{name}] CPU hotspots (own time)", file=out)
+        for (filename, line, function), (_, calls, own, cumulative, _) in hotspots:
+            location = f"{os.path.basename(filename)}:{line}" if line else filename
+            print(f"  {own:>8.3f}s own {cumulative:>8.3f}s cum {calls:>8} calls  {function} ({location})", file=out)
+
+        snapshot_path = os.path.join(bundle_path, f"{name}.snapshot")
+        if os.path.exists(snapshot_path):
+            snapshot = tracemalloc.Snapshot.load(snapshot_path)
+            print(f"[{name}] Allocations held after the peak run", file=out)
+            for statistic in snapshot.statistics("lineno")[:top]:
+                frame = statistic.traceback[0]
+                print(f"  {_format_bytes(statistic.size):>12} {statistic.count:>8} blocks  "
+                      f"{os.path.basename(frame.filename)}:{frame.lineno}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a job profile bundle")
+    parser.add_argument("bundle", help="Bundle directory (<output>.profile-<timestamp>)")
+    parser.add_argument("--top", type=int, default=10, help="Entries per hotspot list")
+    args = parser.parse_args()
+    print_report(args.bundle, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Pre-translation segmentation of subtitle cues.
+
+Cues that contain nothing to translate ("♪", "...", "42", "[DOOR SLAMS]") are
+passed through locally, and formatting tags (<i>, <font color=...>) and
+override tags ({\\an8}) are kept out of the billed text: leading and trailing
+tags are cut off and re-attached, inline tags become <x id="n"/> placeholders
+that DeepL's XML tag handling leaves alone.
+"""
+import re
+from collections import deque
+from xml.sax.saxutils import escape, unescape
+
+# HTML-style formatting tags used in SRT files and ASS/SSA override blocks
+TAG_RE = re.compile(r"</?(?:i|b|u|s|font)\b[^>]*>|\{\\[^}]*\}", re.IGNORECASE)
+TAG_RE_SPLIT = re.compile(f"({TAG_RE.pattern})", re.IGNORECASE)
+
+# Bracketed sound effects / speaker notes: [MUSIC], (LAUGHS), (door slams).
+# Square brackets always are; parentheses only when caption-style, i.e. all
+# caps or a few lowercase words without punctuation, since "(Are you
+# coming?)" is dialogue.
+SOUND_EFFECT_RE = re.compile(r"\[[^\]]*\]|\(([^)]*)\)")
+CAPTION_WORDS_RE = re.compile(r"^[^\W\d_][\w'-]*(?:\s+[\w'-]+){0,2}$")
+
+# Anything left that is not a letter means there is nothing to translate
+NO_LETTERS_RE = re.compile(r"^[\W\d_]*$")
+
+PLACEHOLDER_RE = re.compile(r'<x\s+id="(\d+)"\s*/>')
+LEFTOVER_TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+
+
+def _strip_sound_effect(match):
+    inner = match.group(1)
+    if inner is None or not any(c.islower() for c in inner):
+        return ""
+    inner = inner.strip()
+    if inner[0].islower() and CAPTION_WORDS_RE.match(inner):
+        return ""
+    return match.group(0)
+
+
+def is_untranslatable(text):
+    """True if the cue has no words left once tags and sound effects are removed."""
+    visible = SOUND_EFFECT_RE.sub(_strip_sound_effect, TAG_RE.sub("", text))
+    return bool(NO_LETTERS_RE.match(visible))
+
+
+class Segment:
+    """One cue split into the translatable XML fragment and the parts kept locally."""
+    __slots__ = ("text", "prefix", "markup", "suffix", "tags")
+
+    def __init__(self, text):
+        self.text = text
+        self.prefix = ""
+        self.markup = None
+        self.suffix = ""
+        self.tags = []
+
+        if is_untranslatable(text):
+            return
+
+        # Alternating text/tag tokens: even positions are text, odd ones tags
+        tokens = [(i % 2 == 1, t) for i, t in enumerate(TAG_RE_SPLIT.split(text)) if t]
+
+        prefix = []
+        while tokens and (tokens[0][0] or not tokens[0][1].strip()):
+            prefix.append(tokens.pop(0)[1])
+        suffix = []
+        while tokens and (tokens[-1][0] or not tokens[-1][1].strip()):
+            suffix.insert(0, tokens.pop()[1])
+        if not tokens:
+            return
+
+        # Surrounding whitespace stays local as well
+        first, last = tokens[0][1], tokens[-1][1]
+        prefix.append(first[:len(first) - len(first.lstrip())])
+        suffix.insert(0, last[len(last.rstrip()):])
+        tokens[0] = (False, first.lstrip())
+        tokens[-1] = (False, tokens[-1][1].rstrip())
+
+        markup = []
+        for is_tag, value in tokens:
+            if is_tag:
+                markup.append(f'<x id="{len(self.tags)}"/>')
+                self.tags.append(value)
+            else:
+                markup.append(escape(value))
+
+        self.prefix = "".join(prefix)
+        self.suffix = "".join(suffix)
+        self.markup = "".join(markup)
+
+    @property
+    def passthrough(self):
+        return self.markup is None
+
+    def restore(self, translated_markup):
+        """Rebuilds the cue from a translated fragment, putting the tags back."""
+        used = set()
+        body = []
+        # Split keeps the placeholder ids at odd positions
+        for i, part in enumerate(PLACEHOLDER_RE.split(translated_markup)):
+            if i % 2 == 0:
+                body.append(unescape(LEFTOVER_TAG_RE.sub("", part)))
+                continue
+            tag_id = int(part)
+            if tag_id < len(self.tags) and tag_id not in used:
+                used.add(tag_id)
+                body.append(self.tags[tag_id])
+        # Tags DeepL dropped are re-appended so formatting stays balanced
+        body.extend(tag for i, tag in enumerate(self.tags) if i not in used)
+        return f"{self.prefix}{''.join(body)}{self.suffix}"
+
+
+class SegmentationStats:
+    """Character accounting for a segmented translation run."""
+
+    def __init__(self):
+        self.cues = 0
+        self.passthrough_cues = 0
+        self.source_chars = 0
+        self.sent_chars = 0
+
+    def add(self, segment):
+        self.cues += 1
+        self.source_chars += len(segment.text)
+        if segment.passthrough:
+            self.passthrough_cues += 1
+        else:
+            self.sent_chars += len(unescape(PLACEHOLDER_RE.sub("", segment.markup)))
+
+    @property
+    def saved_chars(self):
+        return self.source_chars - self.sent_chars
+
+    def __str__(self):
+        percent = 100 * self.saved_chars / self.source_chars if self.source_chars else 0
+        return (f"{self.passthrough_cues}/{self.cues} cues kept locally, "
+                f"{self.saved_chars} of {self.source_chars} characters saved ({percent:.1f}%)")
+
+
+def translate_segmented(texts, translate_markup, stats=None):
+    """
+    Segments texts and translates only what needs translating.
+
+    translate_markup receives an iterable of XML fragments and must yield their
+    translations in order (e.g. DeepLTranslator.iter_translations with
+    markup=True). Everything is streamed; only cues still waiting for their
+    translation are held in memory.
+    """
+    stats = stats if stats is not None else SegmentationStats()
+    pending = deque()
+
+    def fragments():
+        for text in texts:
+            segment = Segment(text)
+            stats.add(segment)
+            pending.append(segment)
+            if not segment.passthrough:
+                yield segment.markup
+
+    for translated in translate_markup(fragments()):
+        while pending[0].passthrough:
+            yield pending.popleft().text
+        yield pending.popleft().restore(translated)
+    while pending:
+        yield pending.popleft().text
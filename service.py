@@ -0,0 +1,308 @@
+"""
+Local translation HTTP service.
+
+Runs one long-lived translator (one connection pool, one cache) that several
+tools can share instead of each creating their own. Several keys in
+DEEPL_API_KEYS are shared through a key_pool.PooledDeepLTranslator.
+
+- identical requests that are in flight at the same time are coalesced into a
+  single upstream call (singleflight)
+- small concurrent text requests are micro-batched into packed DeepL requests
+  within a short window
+- text translations are kept in an LRU cache
+
+Endpoints:
+    GET  /health
+    POST /translate            JSON {"text": str | [str], "target_lang": "ID"}
+    POST /translate/srt        SRT body; query: target_lang, pack_cues, filter_cues
+    POST /translate/document   file body; query: target_lang, filename
+    POST /ocr                  image body; query: lang
+
+Usage:
+    python service.py --port 8765 [--deepl-url http://127.0.0.1:8766/v2]
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import srt
+
+from backend import MAX_REQUEST_BYTES, MAX_TEXTS_PER_REQUEST, encoded_size
+from key_pool import translator_from_env
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(func())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+class LRUCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class TextBatcher:
+    """
+    Collects text translation requests for a short window and sends them as
+    packed DeepL requests. Identical (text, target_lang) pairs waiting at the
+    same time share one Future, so they are translated once.
+    """
+
+    def __init__(self, translator, cache, window=0.02):
+        self.translator = translator
+        self.cache = cache
+        self.window = window
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = {}
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, text, target_lang):
+        key = (text, target_lang)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = Future()
+                self._queue.put(key)
+        return future
+
+    def _collect(self, keys):
+        """Fills keys with what arrives within the window (in place, so _run can fail them)."""
+        keys.append(self._queue.get())
+        size = encoded_size(keys[0][0])
+        deadline = time.monotonic() + self.window
+        while len(keys) < MAX_TEXTS_PER_REQUEST * 4 and size < MAX_REQUEST_BYTES:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                key = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            keys.append(key)
+            size += encoded_size(key[0])
+
+    def _run(self):
+        # The only batcher thread: a failed cycle fails its requests, never the thread
+        while True:
+            keys = []
+            try:
+                self._collect(keys)
+                by_lang = {}
+                for text, target_lang in keys:
+                    by_lang.setdefault(target_lang, []).append(text)
+                for target_lang, texts in by_lang.items():
+                    self._translate(texts, target_lang)
+            except Exception as e:
+                print(f"[DEBUG] Batcher: cycle of {len(keys)} texts failed: {e}")
+                self._fail(keys, e)
+
+    def _fail(self, keys, error):
+        with self._lock:
+            futures = [self._pending.pop(key, None) for key in keys]
+        for future in futures:
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    def _translate(self, texts, target_lang):
+        try:
+            translations = list(self.translator.iter_translations(texts, target_lang, pack=len(texts) > 1))
+            error = None
+        except Exception as e:
+            translations, error = None, e
+
+        with self._lock:
+            futures = [self._pending.pop((text, target_lang)) for text in texts]
+        for i, (text, future) in enumerate(zip(texts, futures)):
+            if error is not None:
+                future.set_exception(error)
+                continue
+            self.cache.put((text, target_lang), translations[i])
+            future.set_result(translations[i])
+
+
+class TranslationService:
+    def __init__(self, translator, batch_window=0.02, cache_size=100000):
+        self.translator = translator
+        self.cache = LRUCache(cache_size)
+        self.batcher = TextBatcher(translator, self.cache, batch_window)
+        self.flights = SingleFlight()
+
+    def translate_texts(self, texts, target_lang):
+        results = [self.cache.get((text, target_lang)) for text in texts]
+        futures = {
+            i: self.batcher.submit(text, target_lang)
+            for i, text in enumerate(texts) if results[i] is None
+        }
+        for i, future in futures.items():
+            results[i] = future.result()
+        return results
+
+    def _with_temp_files(self, data, suffix, operation, output_mode="rb"):
+        """Writes data to a temp input file, runs operation(in, out), returns the output."""
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, f"input{suffix}")
+            output_path = os.path.join(directory, f"output{suffix}")
+            with open(input_path, "wb") as f:
+                f.write(data)
+            result = operation(input_path, output_path)
+            if output_mode is None:
+                return result
+            with open(output_path, output_mode) as f:
+                return f.read()
+
+    def translate_srt(self, data, target_lang, pack_cues=False, filter_cues=False):
+        key = ("srt", hashlib.sha256(data).hexdigest(), target_lang, pack_cues, filter_cues)
+        return self.flights.do(key, lambda: self._with_temp_files(
+            data, ".srt",
+            lambda src, dst: self.translator.translate_srt_file(src, target_lang, dst, pack_cues, filter_cues)
+        ))
+
+    def translate_document(self, data, target_lang, filename):
+        suffix = os.path.splitext(filename)[1].lower()
+        key = ("document", hashlib.sha256(data).hexdigest(), target_lang, suffix)
+        return self.flights.do(key, lambda: self._with_temp_files(
+            data, suffix,
+            lambda src, dst: self.translator.translate_document(src, target_lang, dst)
+        ))
+
+    def ocr(self, data, lang):
+        key = ("ocr", hashlib.sha256(data).hexdigest(), lang)
+        return self.flights.do(key, lambda: self._with_temp_files(
+            data, ".img",
+            lambda src, dst: self.translator.extract_text_from_image(src, lang=lang),
+            output_mode=None
+        ))
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, status, body, content_type="application/json"):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, ensure_ascii=False)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send(200, {"status": "ok", "upstream_requests": self.service.translator.text_requests})
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        flag = lambda name: params.get(name, "0").lower() in ("1", "true", "yes")
+        try:
+            if url.path == "/translate":
+                request = json.loads(self._body() or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("request body must be a JSON object")
+                text = request["text"]
+                texts = [text] if isinstance(text, str) else text
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    raise ValueError("text must be a string or a list of strings")
+                if not isinstance(request["target_lang"], str):
+                    raise ValueError("target_lang must be a string")
+                translations = self.service.translate_texts(texts, request["target_lang"])
+                self._send(200, {"translations": [{"text": t} for t in translations]})
+            elif url.path == "/translate/srt":
+                result = self.service.translate_srt(
+                    self._body(), params["target_lang"], flag("pack_cues"), flag("filter_cues")
+                )
+                self._send(200, result, "application/x-subrip; charset=utf-8")
+            elif url.path == "/translate/document":
+                result = self.service.translate_document(
+                    self._body(), params["target_lang"], params.get("filename", "document.docx")
+                )
+                self._send(200, result, "application/octet-stream")
+            elif url.path == "/ocr":
+                text = self.service.ocr(self._body(), params.get("lang", "eng+ind"))
+                self._send(200, {"text": text})
+            else:
+                self._send(404, {"error": "Not found"})
+        except (KeyError, ValueError, TypeError, srt.SRTParseError) as e:
+            self._send(400, {"error": f"Bad request: {e}"})
+        except Exception as e:
+            self._send(502, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        print(f"[DEBUG] {self.address_string()} {format % args}")
+
+
+def create_server(translator, host="127.0.0.1", port=8765, **service_options):
+    handler = type("Handler", (ServiceRequestHandler,), {"service": TranslationService(translator, **service_options)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local DeepL translation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--deepl-url", help="DeepL API base URL, e.g. a local stand-in")
+    parser.add_argument("--batch-window", type=float, default=0.02, help="Micro-batching window in seconds")
+    args = parser.parse_args()
+
+    translator = translator_from_env(base_url=args.deepl_url)
+    server = create_server(translator, args.host, args.port, batch_window=args.batch_window)
+    print(f"Translation service listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from array import array
+from datetime import timedelta
+
+import srt
+
+from cue_store import CueStore, _to_ms
+
+SAMPLE = """1
+00:00:01,000 --> 00:00:02,500 X1:40 X2:600 Y1:20 Y2:50
+First line
+second line
+
+2
+00:00:05,000 --> 00:00:06,000
+Out of order
+
+3
+00:00:03,000 --> 00:00:04,000
+<i>Tagged</i> & escaped?
+
+4
+00:00:03,000 --> 00:00:03,500
+Same start, earlier end
+
+5
+00:01:02,003 --> 01:02:03,004
+Long one
+"""
+
+
+def store_from_subtitles(subtitles):
+    """Builds a store directly, for cases srt.parse cannot produce (negative starts)."""
+    texts = [sub.content for sub in subtitles]
+    offsets = array("Q", [0])
+    for text in texts:
+        offsets.append(offsets[-1] + len(text))
+    return CueStore(
+        array("q", (_to_ms(sub.start) for sub in subtitles)),
+        array("q", (_to_ms(sub.end) for sub in subtitles)),
+        "".join(texts),
+        offsets,
+        {row: sub.proprietary for row, sub in enumerate(subtitles) if sub.proprietary},
+    )
+
+
+def subtitle(index, start_ms, end_ms, content, proprietary=""):
+    return srt.Subtitle(index, timedelta(milliseconds=start_ms), timedelta(milliseconds=end_ms), content, proprietary)
+
+
+def test_roundtrip_matches_srt_compose():
+    assert CueStore.from_srt(SAMPLE).to_srt() == srt.compose(srt.parse(SAMPLE))
+
+
+def test_proprietary_data_is_kept():
+    composed = CueStore.from_srt(SAMPLE).to_srt()
+    assert "00:00:01,000 --> 00:00:02,500 X1:40 X2:600 Y1:20 Y2:50\n" in composed
+
+
+def test_out_of_order_cues_are_sorted_and_reindexed():
+    cues = CueStore.from_srt(SAMPLE)
+    assert list(cues.iter_texts())[1] == "Out of order"  # rows keep file order
+    composed = list(srt.parse(cues.to_srt()))
+    assert [sub.index for sub in composed] == [1, 2, 3, 4, 5]
+    assert [sub.content for sub in composed][1:4] == [
+        "Same start, earlier end", "<i>Tagged</i> & escaped?", "Out of order"
+    ]
+
+
+def test_skipped_cues_match_srt_compose():
+    subtitles = [
+        subtitle(1, 1000, 2000, "Kept"),
+        subtitle(2, 3000, 4000, "   \n "),  # empty
+        subtitle(3, 5000, 5000, "Zero length"),
+        subtitle(4, 7000, 6000, "Ends before it starts"),
+        subtitle(5, -1000, 500, "Negative start"),
+        subtitle(6, 8000, 9000, "Also kept", "X1:1"),
+    ]
+    composed = store_from_subtitles(subtitles).to_srt()
+    assert composed == srt.compose(subtitles)
+    assert [sub.content for sub in srt.parse(composed)] == ["Kept", "Also kept"]
+
+
+def test_blank_lines_in_content_are_made_legal():
+    subtitles = [subtitle(1, 0, 1000, "Line one\n\nLine two\n")]
+    assert store_from_subtitles(subtitles).to_srt() == srt.compose(subtitles)
+
+
+def test_with_texts_keeps_timing_and_proprietary():
+    cues = CueStore.from_srt(SAMPLE)
+    translated = cues.with_texts(text.upper() for text in cues.iter_texts())
+    expected = list(srt.parse(SAMPLE))
+    for sub in expected:
+        sub.content = sub.content.upper()
+    assert translated.to_srt() == srt.compose(expected)
+    assert translated.starts is cues.starts
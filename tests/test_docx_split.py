@@ -0,0 +1,101 @@
+import shutil
+import zipfile
+
+import pytest
+
+from docx_split import (
+    DOCUMENT_RELS, DOCUMENT_XML, DocxMergeError, merge_parts, split_body, translate_docx_in_parts
+)
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" '
+    'Target="media/image1.png"/>'
+    '</Relationships>'
+)
+
+
+def paragraph(i):
+    page_break = '<w:r><w:br w:type="page"/></w:r>' if i % 5 == 4 else ""
+    return f'<w:p><w:r><w:t xml:space="preserve">Paragraph {i} {"text " * 20}</w:t></w:r>{page_break}</w:p>'
+
+
+def write_docx(path, paragraphs, rels=RELS):
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:document {W}><w:body>'
+        + "".join(paragraphs)
+        + '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/></w:sectPr></w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("[Content_Types].xml", "<Types/>")
+        z.writestr(DOCUMENT_XML, document)
+        z.writestr(DOCUMENT_RELS, rels)
+        z.writestr("word/styles.xml", "<w:styles/>")
+        z.writestr("word/media/image1.png", b"\x89PNG fake")
+    return path
+
+
+class CopyTranslator:
+    """Document jobs that return the package unchanged."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def translate_document(self, filepath, target_lang, output_path):
+        self.jobs.append(filepath)
+        shutil.copy(filepath, output_path)
+
+
+def read(path, name):
+    with zipfile.ZipFile(path) as z:
+        return z.read(name)
+
+
+def test_split_and_merge_round_trip(tmp_path):
+    paragraphs = [paragraph(i) for i in range(40)]
+    source = write_docx(tmp_path / "big.docx", paragraphs)
+    output = tmp_path / "big_ID.docx"
+    translator = CopyTranslator()
+
+    parts = translate_docx_in_parts(translator, str(source), "ID", str(output), target_chars=1000)
+
+    assert parts > 1
+    assert len(translator.jobs) == parts
+    assert read(output, DOCUMENT_XML) == read(source, DOCUMENT_XML)
+    for name in (DOCUMENT_RELS, "word/styles.xml", "word/media/image1.png"):
+        assert read(output, name) == read(source, name)
+
+
+def test_small_document_is_one_job(tmp_path):
+    source = write_docx(tmp_path / "small.docx", [paragraph(i) for i in range(3)])
+    translator = CopyTranslator()
+    assert translate_docx_in_parts(translator, str(source), "ID", str(tmp_path / "out.docx")) == 1
+    assert translator.jobs == [str(source)]
+
+
+def test_rels_compared_by_content_not_bytes(tmp_path):
+    reordered = RELS.replace('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n', "").replace(
+        'Id="rId1" Type', 'Type'
+    ).replace('Target="styles.xml"', 'Target="styles.xml" Id="rId1"')
+    first = write_docx(tmp_path / "a.docx", [paragraph(0)])
+    second = write_docx(tmp_path / "b.docx", [paragraph(1)], rels=reordered)
+    output = tmp_path / "merged.docx"
+
+    merge_parts([str(first), str(second)], str(output))
+
+    _, blocks, _, _ = split_body(read(output, DOCUMENT_XML).decode("utf-8"))
+    assert blocks == [paragraph(0), paragraph(1)]
+
+
+def test_mismatched_rels_raise_without_writing(tmp_path):
+    first = write_docx(tmp_path / "a.docx", [paragraph(0)])
+    second = write_docx(tmp_path / "b.docx", [paragraph(1)], rels=RELS.replace("image1.png", "image2.png"))
+    output = tmp_path / "merged.docx"
+
+    with pytest.raises(DocxMergeError):
+        merge_parts([str(first), str(second)], str(output))
+    assert not output.exists()
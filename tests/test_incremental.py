@@ -0,0 +1,76 @@
+from cue_store import CueStore, _srt_timestamp
+from incremental import align_previous_translations, merge_translations, pair_previous
+
+
+def make_store(cues):
+    """cues: [(start_ms, text)], each cue lasting 2 seconds."""
+    return CueStore.from_srt("\n".join(
+        f"{i}\n{_srt_timestamp(start)} --> {_srt_timestamp(start + 2000)}\n{text}\n"
+        for i, (start, text) in enumerate(cues, start=1)
+    ))
+
+
+OLD_SOURCE = [(0, "Yes."), (3000, "Where are you?"), (6000, "Yes."), (9000, "No."), (12000, "Yes.")]
+OLD_TRANSLATION = [(0, "Ja. 1"), (3000, "Wo bist du?"), (6000, "Ja. 2"), (9000, "Nein."), (12000, "Ja. 3")]
+
+
+def align(new_cues, old_source=OLD_SOURCE, old_translation=OLD_TRANSLATION):
+    return align_previous_translations(make_store(new_cues), make_store(old_source), make_store(old_translation))
+
+
+def test_unchanged_file_reuses_everything():
+    assert align(OLD_SOURCE) == ["Ja. 1", "Wo bist du?", "Ja. 2", "Nein.", "Ja. 3"]
+
+
+def test_duplicate_texts_stay_in_order_after_global_shift():
+    # Shifted by more than the gap between cues: nearest-in-time alone would
+    # hand the first "Yes." the translation of the second one
+    shifted = [(start + 7000, text) for start, text in OLD_SOURCE]
+    assert align(shifted) == ["Ja. 1", "Wo bist du?", "Ja. 2", "Nein.", "Ja. 3"]
+
+
+def test_duplicate_text_removed_keeps_the_remaining_ones_paired():
+    new = [(0, "Yes."), (3000, "Where are you?"), (9000, "No."), (12000, "Yes.")]
+    assert align(new) == ["Ja. 1", "Wo bist du?", "Nein.", "Ja. 3"]
+
+
+def test_edited_and_new_cues_need_translation():
+    new = [(0, "Yes."), (3000, "Where are you now?"), (6000, "Yes."), (9000, "No."), (12000, "Yes."), (15000, "Bye.")]
+    assert align(new) == ["Ja. 1", None, "Ja. 2", "Nein.", "Ja. 3", None]
+
+
+def test_whitespace_changes_count_as_unchanged():
+    new = [(0, "Yes."), (3000, "Where  are\nyou? "), (6000, "Yes.")]
+    assert align(new) == ["Ja. 1", "Wo bist du?", "Ja. 2"]
+
+
+def test_pair_previous_is_row_by_row_when_timings_match():
+    assert pair_previous(make_store(OLD_SOURCE), make_store(OLD_TRANSLATION)) == [
+        "Ja. 1", "Wo bist du?", "Ja. 2", "Nein.", "Ja. 3"
+    ]
+
+
+def test_pair_previous_falls_back_to_timing():
+    # Translation is missing the cue at 3000 and has an extra one
+    translation = [(0, "Ja. 1"), (6000, "Ja. 2"), (7500, "Extra"), (9000, "Nein."), (12000, "Ja. 3")]
+    assert pair_previous(make_store(OLD_SOURCE), make_store(translation)) == [
+        "Ja. 1", None, "Ja. 2", "Nein.", "Ja. 3"
+    ]
+
+
+def test_untranslated_old_cues_are_not_reused():
+    translation = [(0, "Ja. 1"), (6000, "Ja. 2"), (9000, "Nein."), (12000, "Ja. 3")]
+    assert align(OLD_SOURCE, old_translation=translation)[1] is None
+
+
+def test_merge_translations_translates_only_missing_texts_once():
+    calls = []
+
+    def translate(texts):
+        texts = list(texts)
+        calls.append(texts)
+        return [text.upper() for text in texts]
+
+    merged = list(merge_translations(["a", None, "c", None], translate, ["x", "y", "z", "w"]))
+    assert merged == ["a", "Y", "c", "W"]
+    assert calls == [["y", "w"]]
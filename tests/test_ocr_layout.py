@@ -0,0 +1,61 @@
+from backend import BaseTranslator
+from deepl_stub import fake_translate
+from ocr_layout import WORD_LEVEL, format_blocks, group_words, translate_blocks
+
+# (block, paragraph, line, word, left, top, width, height, confidence)
+WORDS = [
+    (1, 1, 1, "Heading", 10, 10, 80, 20, 95),
+    (1, 2, 1, "First", 10, 40, 40, 12, 90),
+    (1, 2, 1, "sen-", 55, 40, 30, 12, 90),
+    (1, 2, 2, "tence.", 10, 56, 45, 12, 90),
+    (1, 2, 2, "~", 60, 56, 5, 5, 20),
+    (2, 1, 1, "Sidebar", 300, 10, 60, 12, 80),
+]
+
+
+def image_data(words):
+    columns = ("block_num", "par_num", "line_num", "text", "left", "top", "width", "height", "conf")
+    data = {column: [] for column in columns + ("level", "page_num")}
+    for word in words:
+        for column, value in zip(columns, word):
+            data[column].append(value)
+        data["level"].append(WORD_LEVEL)
+        data["page_num"].append(1)
+    return data
+
+
+class FakeTranslator(BaseTranslator):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def translate_text_content(self, text, target_lang, **options):
+        self.requests.append(text)
+        packed = options.get("splitting_tags") == "c"
+        return [fake_translate(t, target_lang, packed) for t in text]
+
+
+def test_words_are_grouped_into_paragraphs_with_boxes():
+    blocks = group_words(image_data(WORDS))
+    assert [b.text for b in blocks] == ["Heading\nFirst sentence.", "Sidebar"]
+    heading, body = blocks[0].paragraphs
+    assert heading.box == (10, 10, 80, 20)
+    assert body.box == (10, 40, 75, 28)  # the low-confidence "~" is dropped
+    assert blocks[0].box == (10, 10, 80, 58)
+    assert blocks[1].number == 2
+
+
+def test_every_paragraph_is_its_own_packed_element():
+    blocks = group_words(image_data(WORDS))
+    translator = FakeTranslator()
+    translate_blocks(translator, blocks, "DE")
+
+    assert len(translator.requests) == 1
+    assert translator.requests[0][0].count("<c id=") == 3
+    assert "<br" not in translator.requests[0][0]
+    assert [p.translation for p in blocks[0].paragraphs] == ["Heading [DE]", "First sentence. [DE]"]
+    assert format_blocks(blocks, translated=True) == "Heading [DE]\nFirst sentence. [DE]\n\nSidebar [DE]"
+
+
+def test_untranslated_block_has_no_translation():
+    assert group_words(image_data(WORDS))[0].translation is None
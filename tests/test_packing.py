@@ -0,0 +1,90 @@
+import requests
+
+from backend import (
+    MAX_REQUEST_BYTES,
+    DeepLTranslator,
+    encoded_size,
+    iter_batches,
+    pack_cues,
+    plan_packs,
+    unpack_cues,
+)
+from segmentation import Segment
+
+
+def test_pack_unpack_roundtrip():
+    fragments = ["Hello", "two\nlines", "&amp; &lt;3"]
+    assert unpack_cues(pack_cues(fragments), len(fragments)) == fragments
+
+
+def test_placeholders_survive_packing():
+    unpacked = unpack_cues(pack_cues(['a <x id="0"/>tag<x id="1"/>']), 1)
+    assert unpacked == ['a <x id="0" />tag<x id="1" />']
+    assert Segment("a <b>tag</b>").restore(unpacked[0]) == "a <b>tag</b>"
+
+
+def test_unpack_rejects_broken_xml():
+    assert unpack_cues('<c id="0">Hello</c><c id="1">World', 2) is None
+
+
+def test_unpack_rejects_missing_ids():
+    assert unpack_cues('<c id="0">Hello</c>', 2) is None
+    assert unpack_cues('<c id="0">Hello</c><c>World</c>', 2) is None
+
+
+def test_unpack_rejects_reordered_ids():
+    assert unpack_cues('<c id="1">World</c><c id="0">Hello</c>', 2) is None
+
+
+def test_unpack_rejects_text_outside_elements():
+    assert unpack_cues('Hi <c id="0">Hello</c>', 1) is None
+    assert unpack_cues('<c id="0">Hello</c> there<c id="1">World</c>', 2) is None
+
+
+def test_unpack_rejects_unexpected_elements():
+    assert unpack_cues('<c id="0">Hello</c><d id="1">World</d>', 2) is None
+
+
+def test_plan_packs_respects_size():
+    packs = list(plan_packs(["a" * 30] * 10, max_chars=100))
+    assert [len(p) for p in packs] == [3, 3, 3, 1]
+
+
+def test_encoded_size_matches_request_body():
+    for text in ["plain", '<c id="0">x<br/></c>', "日本語のテキスト", "a&b=c d"]:
+        body = requests.Request("POST", "http://x", data={"text": [text, text]}).prepare().body
+        assert len(body) == 2 * encoded_size(text) - 1
+
+
+def test_batches_stay_under_body_limit():
+    texts = ["字幕のテキスト" * 50] * 1000
+    for batch in iter_batches(texts):
+        assert sum(encoded_size(t) for t in batch) <= MAX_REQUEST_BYTES
+        assert len(batch) <= 50
+
+
+class FakeTranslator(DeepLTranslator):
+    def __init__(self, mangle):
+        super().__init__(api_key="test:fx")
+        self.mangle = mangle
+        self.requests = []
+
+    def translate_text_content(self, text, target_lang, **options):
+        self.requests.append((text, options))
+        if options.get("splitting_tags") == "c" and self.mangle:
+            return [t.replace('id="1"', 'id="9"') for t in text]
+        return [t.replace("one", "eins").replace("five", "fünf") for t in text]
+
+
+def test_packed_translation_is_one_request():
+    translator = FakeTranslator(mangle=False)
+    texts = ["one & two", "three\nfour", "five"]
+    assert list(translator.iter_translations(texts, "DE", pack=True)) == ["eins & two", "three\nfour", "fünf"]
+    assert len(translator.requests) == 1
+
+
+def test_mangled_pack_falls_back_cue_by_cue():
+    translator = FakeTranslator(mangle=True)
+    texts = ["one", "two", "three"]
+    assert list(translator.iter_translations(texts, "DE", pack=True)) == ["eins", "two", "three"]
+    assert translator.requests[-1] == (["one", "two", "three"], {"tag_handling": "xml"})
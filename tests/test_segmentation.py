@@ -0,0 +1,67 @@
+import pytest
+
+from segmentation import Segment, SegmentationStats, is_untranslatable, translate_segmented
+
+
+@pytest.mark.parametrize("text", [
+    "♪", "...", "42", "[MUSIC]", "(laughs)", "(door slams)", "(LAUGHS)", "<i>♪</i>", "{\\an8}[THUD]",
+    "- (gasps)\n- [THUD]",
+])
+def test_untranslatable(text):
+    assert is_untranslatable(text)
+
+
+@pytest.mark.parametrize("text", [
+    "Hello", "(Are you coming?)", "(whispering) Go now.", "(Yes)", "<i>Hi</i>", "[MUSIC] Run!",
+])
+def test_translatable(text):
+    assert not is_untranslatable(text)
+
+
+def test_outer_tags_and_whitespace_stay_local():
+    segment = Segment("{\\an8}<i> Hello <b>world</b> & co</i>")
+    assert segment.prefix == "{\\an8}<i> "
+    assert segment.suffix == "</i>"
+    assert segment.markup == 'Hello <x id="0"/>world<x id="1"/> &amp; co'
+    assert segment.tags == ["<b>", "</b>"]
+
+
+def test_restore_roundtrip():
+    segment = Segment("<i>Hello <b>world</b> & co</i>")
+    assert segment.restore(segment.markup) == segment.text
+
+
+def test_restore_follows_translated_placeholder_order():
+    segment = Segment("A <b>B</b> C <u>D</u> E")
+    assert segment.restore('e <x id="2"/>d<x id="3"/> c <x id="0"/>b<x id="1"/> a') == "e <u>d</u> c <b>b</b> a"
+
+
+def test_restore_reappends_dropped_placeholders():
+    segment = Segment("Say <b>hi</b> now")
+    assert segment.restore('Sag <x id="0"/>hallo jetzt') == "Sag <b>hallo jetzt</b>"
+
+
+def test_restore_ignores_duplicated_and_unknown_placeholders():
+    segment = Segment("Say <b>hi</b> now")
+    restored = segment.restore('<x id="0"/>Sag <x id="0"/>hallo<x id="1"/><x id="7"/> jetzt')
+    assert restored == "<b>Sag hallo</b> jetzt"
+
+
+def test_restore_strips_other_tags_and_unescapes():
+    segment = Segment("Tom <i>&</i> Jerry")
+    assert segment.restore('Tom <x id="0"/>&amp;<x id="1"/> <em>Jerry</em>') == "Tom <i>&</i> Jerry"
+
+
+def test_translate_segmented_keeps_order_and_sends_only_fragments():
+    sent = []
+
+    def translate_markup(fragments):
+        for fragment in fragments:
+            sent.append(fragment)
+            yield fragment.upper()
+
+    stats = SegmentationStats()
+    texts = ["♪", "<i>one</i>", "[MUSIC]", "two", "..."]
+    assert list(translate_segmented(texts, translate_markup, stats)) == ["♪", "<i>ONE</i>", "[MUSIC]", "TWO", "..."]
+    assert sent == ["one", "two"]
+    assert (stats.cues, stats.passthrough_cues, stats.sent_chars) == (5, 3, 6)
@@ -0,0 +1,83 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from backend import DeepLTranslator
+from deepl_stub import StubHandler
+from service import create_server
+
+SRT = """1
+00:00:01,000 --> 00:00:02,000
+Hello
+
+2
+00:00:03,000 --> 00:00:04,000
+World
+
+"""
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(StubHandler, "stats", {"translate": 0, "document": 0, "texts": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    yield serve(server)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service(stub):
+    translator = DeepLTranslator("test:fx", max_retries=0, base_url=f"{stub}/v2")
+    server = create_server(translator, port=0, batch_window=0.2)
+    yield serve(server)
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body, content_type="application/json"):
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body).encode("utf-8")
+    request = Request(url, data=body, headers={"Content-Type": content_type})
+    with urlopen(request, timeout=10) as response:
+        return response.read()
+
+
+def test_concurrent_identical_requests_make_one_upstream_call(service):
+    body = {"text": "Hello there", "target_lang": "ID"}
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: json.loads(post(f"{service}/translate", body)), range(8)))
+
+    assert all(r == {"translations": [{"text": "Hello there [ID]"}]} for r in results)
+    assert StubHandler.stats["translate"] == 1
+    with urlopen(f"{service}/health", timeout=10) as response:
+        assert json.loads(response.read())["upstream_requests"] == 1
+
+
+def test_srt_round_trip(service):
+    result = post(f"{service}/translate/srt?target_lang=ID&pack_cues=1", SRT.encode("utf-8"), "application/x-subrip")
+    assert result.decode("utf-8") == SRT.replace("Hello", "Hello [ID]").replace("World", "World [ID]")
+    assert StubHandler.stats["translate"] == 1
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/translate", [1, 2]),
+    ("/translate", {"text": ["ok", 3], "target_lang": "ID"}),
+    ("/translate", {"text": "ok"}),
+    ("/translate/srt?target_lang=ID", b"not an srt file"),
+])
+def test_bad_requests_are_rejected(service, path, body):
+    with pytest.raises(HTTPError) as error:
+        post(f"{service}{path}", body)
+    assert error.value.code == 400
+    assert StubHandler.stats["translate"] == 0
@@ -262,3 +262,57 @@ class OCRResultWindow(TranslationResultWindow):
             # Hide original text section since we only have extracted text
             self.content_frame.grid_slaves(row=0)[0].grid_forget()
             self.arrow_label.grid_forget()
+
+
+class LayoutOCRResultWindow(TranslationResultWindow):
+    """
+    OCR & translation result for layout-aware OCR: one row per text block,
+    original next to translation, with the block's position in the image
+    """
+    def __init__(self, parent, blocks, ocr_lang="eng+ind", target_lang="ID"):
+        self.blocks = blocks
+        original_text = "\n\n".join(block.text for block in blocks)
+        translated_text = "\n\n".join(block.translation or "" for block in blocks)
+        super().__init__(parent, original_text, translated_text, ocr_lang, target_lang)
+        self.title("Layout OCR & Translation Result")
+        self.geometry("1000x700")
+        self.title_label.configure(text="🔍 Layout OCR & Translation Complete")
+
+    def create_widgets(self):
+        super().create_widgets()
+        # Replace the two big text sections with a scrollable list of blocks
+        for widget in self.content_frame.winfo_children():
+            widget.destroy()
+
+        blocks_frame = ctk.CTkScrollableFrame(self.content_frame, fg_color="transparent")
+        blocks_frame.grid(row=0, column=0, sticky="nsew")
+        blocks_frame.grid_columnconfigure((0, 1), weight=1)
+        self.content_frame.grid_rowconfigure(2, weight=0)
+
+        for row, block in enumerate(self.blocks):
+            left, top, width, height = block.box
+            header = ctk.CTkLabel(
+                blocks_frame,
+                text=f"Block {block.number}  •  x={left} y={top} {width}×{height}  •  confidence {block.confidence:.0f}%",
+                font=("Roboto", 11),
+                text_color="gray",
+                anchor="w"
+            )
+            header.grid(row=row * 2, column=0, columnspan=2, sticky="w", padx=5, pady=(10, 0))
+            for column, (text, highlight) in enumerate(((block.text, False), (block.translation or "", True))):
+                self.create_block_text(blocks_frame, text, row * 2 + 1, column, highlight)
+
+    def create_block_text(self, parent, text, row, column, highlight=False):
+        """A read-only textbox sized to the block's text"""
+        textbox = ctk.CTkTextbox(
+            parent,
+            font=("Segoe UI", 13),
+            wrap="word",
+            height=min(40 + 20 * (text.count("\n") + len(text) // 60), 240),
+            fg_color=("white", "#1e1e1e") if not highlight else ("#e8f5e9", "#0d3d0d"),
+            border_width=0,
+            corner_radius=8
+        )
+        textbox.grid(row=row, column=column, sticky="nsew", padx=5, pady=5)
+        textbox.insert("1.0", text)
+        textbox.configure(state="disabled")
@@ -0,0 +1,297 @@
+"""
+Watch-folder daemon for continuous drop-in translation.
+
+Watches one or more directories and translates every supported file (SRT,
+TXT, DOCX, PDF) that lands there to name_<LANG>.ext next to it:
+
+- file system events come from watchdog (inotify on Linux, FSEvents/
+  ReadDirectoryChanges elsewhere); without watchdog it falls back to polling
+- a file is only picked up once its size and mtime stopped changing for a
+  settle period, so partially written files are not translated
+- translations run on a fixed pool of worker threads and are written to a
+  temporary file first, then moved into place atomically
+- a JSON state file remembers finished and queued files, so a restart
+  neither re-translates finished files nor loses queued ones
+- a file that failed is only retried once it changes (new size or mtime)
+
+Usage:
+    python watcher.py /share/inbox --target-lang ID [--workers 4]
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+
+from backend import SUPPORTED_EXTENSIONS, output_path_for
+from key_pool import translator_from_env
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None  # watchdog not installed, fall back to polling
+
+STATE_FILENAME = ".translate_watch_state.json"
+
+
+def _atomic_write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class WatchState:
+    """Persistent per-file status: queued, done or failed, with the file signature."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.files = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+
+    def _save(self):
+        _atomic_write_json(self.path, {"files": self.files})
+
+    def is_finished(self, path, signature):
+        """Done or failed for this exact file version; only a changed file is tried again."""
+        entry = self.files.get(path)
+        return (
+            bool(entry) and entry["status"] in ("done", "failed")
+            and tuple(entry.get("signature", ())) == tuple(signature)
+        )
+
+    def mark(self, path, status, signature=None, **extra):
+        with self._lock:
+            entry = self.files.setdefault(path, {})
+            entry.update(status=status, updated=time.time(), **extra)
+            if signature is not None:
+                entry["signature"] = list(signature)
+            self._save()
+
+    def queued(self):
+        return [path for path, entry in self.files.items() if entry["status"] == "queued"]
+
+
+class TranslationDaemon:
+    def __init__(self, translator, directories, target_lang, workers=4, settle_seconds=2.0,
+                 state_path=None, recursive=False, poll_interval=2.0, **options):
+        """
+        Args:
+            translator: DeepLTranslator (or PooledDeepLTranslator) used by all workers
+            directories: Directories to watch
+            target_lang: DeepL target language, also used in output names
+            workers: Number of files translated concurrently
+            settle_seconds: How long size/mtime must stay unchanged before a file is taken
+            state_path: State file (default: .translate_watch_state.json in the first directory)
+            recursive: Also watch subdirectories
+            poll_interval: Scan interval when watchdog is not available
+            options: pack_cues / filter_cues / split_docx, see DeepLTranslator.translate_file
+        """
+        self.translator = translator
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.target_lang = target_lang
+        self.workers = workers
+        self.settle_seconds = settle_seconds
+        self.recursive = recursive
+        self.poll_interval = poll_interval
+        self.options = options
+        self.state = WatchState(state_path or os.path.join(self.directories[0], STATE_FILENAME))
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._settling = {}  # path -> (signature, time the signature was first seen)
+        self._active = set()
+        self._stop = threading.Event()
+
+    def is_candidate(self, path):
+        name, ext = os.path.splitext(os.path.basename(path))
+        return (
+            ext.lower() in SUPPORTED_EXTENSIONS
+            and not name.startswith(".")
+            and not name.endswith(f"_{self.target_lang}")
+        )
+
+    def notice(self, path):
+        """Called for every created/modified/moved-in file; starts (or restarts) debouncing."""
+        path = os.path.abspath(path)
+        if not self.is_candidate(path):
+            return
+        with self._lock:
+            if path not in self._active:
+                self._settling[path] = (None, time.monotonic())
+
+    def _check_settled(self):
+        now = time.monotonic()
+        with self._lock:
+            settling = list(self._settling.items())
+        for path, (last_signature, since) in settling:
+            try:
+                signature = _signature(path)
+            except OSError:
+                with self._lock:
+                    self._settling.pop(path, None)
+                continue
+            if signature != last_signature:
+                with self._lock:
+                    self._settling[path] = (signature, now)
+                continue
+            if now - since >= self.settle_seconds:
+                with self._lock:
+                    self._settling.pop(path, None)
+                self._enqueue(path, signature)
+
+    def _enqueue(self, path, signature):
+        if self.state.is_finished(path, signature):
+            return
+        with self._lock:
+            if path in self._active:
+                return
+            self._active.add(path)
+        self.state.mark(path, "queued", signature)
+        self._queue.put(path)
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                path = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._translate(path)
+            finally:
+                with self._lock:
+                    self._active.discard(path)
+                self._queue.task_done()
+
+    def _translate(self, path):
+        output_path = output_path_for(path, self.target_lang)
+        directory, filename = os.path.split(output_path)
+        tmp_path = os.path.join(directory, f".{filename}.part")
+        signature = None
+        try:
+            signature = _signature(path)
+            print(f"[DEBUG] Watcher: translating {path}")
+            started = time.monotonic()
+            self.translator.translate_file(path, self.target_lang, tmp_path, **self.options)
+            os.replace(tmp_path, output_path)
+            self.state.mark(path, "done", signature, output=output_path)
+            print(f"[DEBUG] Watcher: {os.path.basename(output_path)} done in {time.monotonic() - started:.1f}s")
+        except FileNotFoundError:
+            self.state.mark(path, "failed", error="file disappeared")
+        except Exception as e:
+            print(f"[DEBUG] Watcher: failed to translate {path}: {e}")
+            # Not retried until the file changes, so a broken file is not uploaded (and billed) over and over
+            self.state.mark(path, "failed", signature, error=str(e))
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _iter_existing(self):
+        for directory in self.directories:
+            if self.recursive:
+                for root, _, files in os.walk(directory):
+                    yield from (os.path.join(root, f) for f in files)
+            else:
+                with os.scandir(directory) as entries:
+                    yield from (e.path for e in entries if e.is_file())
+
+    def _start_observer(self):
+        daemon = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    daemon.notice(event.src_path)
+
+            on_modified = on_created
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    daemon.notice(event.dest_path)
+
+        observer = Observer()
+        for directory in self.directories:
+            observer.schedule(Handler(), directory, recursive=self.recursive)
+        observer.start()
+        return observer
+
+    def run(self):
+        """Runs until stop() is called (or Ctrl+C)."""
+        for _ in range(self.workers):
+            threading.Thread(target=self._work, daemon=True).start()
+
+        # Resume what was queued before a restart, then catch up once on files
+        # that arrived while the daemon was not running
+        for path in self.state.queued():
+            if os.path.exists(path):
+                self._settling[path] = (None, time.monotonic())
+        for path in self._iter_existing():
+            self.notice(path)
+
+        observer = self._start_observer() if Observer is not None else None
+        print(f"[DEBUG] Watcher: watching {', '.join(self.directories)} "
+              f"({'events' if observer else 'polling'}, {self.workers} workers)")
+        last_poll = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                self._stop.wait(0.5)
+                if observer is None and time.monotonic() - last_poll >= self.poll_interval:
+                    for path in self._iter_existing():
+                        if self.is_candidate(path) and path not in self._settling:
+                            self._poll_candidate(path)
+                    last_poll = time.monotonic()
+                self._check_settled()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def _poll_candidate(self, path):
+        try:
+            signature = _signature(path)
+        except OSError:
+            return
+        if not self.state.is_finished(path, signature):
+            self.notice(path)
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate files dropped into watched folders")
+    parser.add_argument("directories", nargs="+")
+    parser.add_argument("--target-lang", required=True)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds a file must be unchanged")
+    parser.add_argument("--state", help="State file path")
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--pack-cues", action="store_true")
+    parser.add_argument("--filter-cues", action="store_true")
+    parser.add_argument("--split-docx", action="store_true", help="Translate large DOCX files in parallel parts")
+    args = parser.parse_args()
+
+    daemon = TranslationDaemon(
+        translator_from_env(), args.directories, args.target_lang,
+        workers=args.workers, settle_seconds=args.settle, state_path=args.state,
+        recursive=args.recursive, pack_cues=args.pack_cues, filter_cues=args.filter_cues,
+        split_docx=args.split_docx
+    )
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()